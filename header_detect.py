@@ -0,0 +1,288 @@
+# -*- coding: utf-8 -*-
+"""
+Detección de cabeceras de nómina (parte CPU del split por página)
+
+Módulo autocontenido y anotado para poder compilarse con mypyc:
+    mypyc header_detect.py
+Si existe la extensión compilada, Python la importa en lugar de este .py;
+si no, se usa este mismo fichero sin cambios de comportamiento.
+
+Requisitos:
+  pip install pyahocorasick   (opcional: acelera la búsqueda de meses)
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from itertools import islice
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import ahocorasick  # type: ignore  # opcional (pyahocorasick): búsqueda de meses en una pasada
+except ImportError:
+    ahocorasick = None
+
+PERIODO_MAX_LINE = 60        # Líneas de cabecera en las que se busca "PERÍODO"
+
+MonthYear = Tuple[Optional[str], Optional[str]]
+
+# ===== Patrones y utilidades =====
+MONTHS_ES = {
+    'enero': '01','febrero': '02','marzo': '03','abril': '04','mayo': '05','junio': '06',
+    'julio': '07','agosto': '08','septiembre': '09','setiembre': '09','octubre': '10',
+    'noviembre': '11','diciembre': '12'
+}
+MONTH_PATTERN = re.compile(r"(?i)\b(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|octubre|noviembre|diciembre)\b")
+YEAR_PATTERN  = re.compile(r"\b(20\d{2})\b")
+
+if ahocorasick is not None:
+    MONTH_AUTOMATON = ahocorasick.Automaton()
+    for _mes in MONTHS_ES:
+        MONTH_AUTOMATON.add_word(_mes, len(_mes))
+    MONTH_AUTOMATON.make_automaton()
+else:
+    MONTH_AUTOMATON = None
+
+# re.I también iguala 'ı' con 'i' y 'ſ' con 's'; se replica al pasar a minúsculas
+_MONTH_FOLD = str.maketrans({'\u0131': 'i', '\u017f': 's'})
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == '_'
+
+def search_month(line: str) -> Optional[str]:
+    """Primer mes de la línea (texto original), igual que MONTH_PATTERN.search(line).group(1)."""
+    low = line.lower().translate(_MONTH_FOLD)
+    if MONTH_AUTOMATON is None or len(low) != len(line):
+        m = MONTH_PATTERN.search(line)
+        return m.group(1) if m else None
+    for end, size in MONTH_AUTOMATON.iter(low):
+        start = end - size + 1
+        if (start == 0 or not _is_word_char(low[start-1])) and \
+           (end + 1 == len(low) or not _is_word_char(low[end+1])):
+            return line[start:end+1]
+    return None
+
+RE_CODE_NAME_BLOCK = re.compile(r"\n\s*(\d{2,6})\/(\d)\s*\n\s*([A-ZÁÉÍÓÚÜÑ ,.'\-]+?)\s*\n")
+RE_PERIODO = re.compile(r"(?i)per[ií]odo")
+RE_DAY_MONTH = re.compile(r"\b(\d{1,2})\s+(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|octubre|noviembre|diciembre)\b", re.I)
+RE_AFILIACION = re.compile(r"(?i)afiliaci[oó]n\s*s\.s\.\s*\n\s*([0-9]{3,12})")
+RE_INNER_SPACE = re.compile(r"\s")  # en una línea ya recortada equivale a len(l.split()) >= 2
+# Barrido único de las líneas superiores (unidas con '\n'): NIF y código genérico.
+# Los espacios no cruzan saltos de línea, igual que al buscar línea a línea, y el
+# valor del NIF va en lookahead para no ocultar números al grupo 'code'.
+RE_TOP_FIELDS = re.compile(
+    r"(?P<nif>\b(?:NIF|DNI|N\.I\.F\.)\b[^\S\n]*[:\-]?[^\S\n]*(?=(?P<nif_val>[A-Z0-9]{5,})))"
+    r"|(?P<code>\b\d{3,6}\b)",
+    re.I
+)
+
+RE_SANE_INVALID = re.compile(r"[^A-Za-z0-9_\-]")
+RE_SANE_UNDERSCORES = re.compile(r"_+")
+
+def _strip_accents_slow(s: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+
+# Latin-1 y Latin Extended-A sin acento, con la misma regla NFD + quitar marcas
+_ACCENT_TABLE: Dict[int, str] = {
+    cp: stripped
+    for cp, stripped in ((cp, _strip_accents_slow(chr(cp))) for cp in range(0xC0, 0x180))
+    if stripped != chr(cp)
+}
+
+@lru_cache(maxsize=4096)
+def strip_accents(s: str) -> str:
+    if s.isascii():
+        return s
+    out = s.translate(_ACCENT_TABLE)
+    if out.isascii():
+        return out
+    return _strip_accents_slow(s)
+
+@lru_cache(maxsize=4096)
+def sane(s: str) -> str:
+    s = strip_accents(s)
+    s = RE_SANE_INVALID.sub("_", s)
+    return RE_SANE_UNDERSCORES.sub("_", s).strip("._")[:200]
+
+def get_lines(text: str) -> List[str]:
+    return [l.strip() for l in text.splitlines()]
+
+def _scan_months_years(lines: List[str], start_idx: int,
+                       end_idx: int) -> Tuple[List[Tuple[int, str]], List[Tuple[int, str]]]:
+    """(idx, mes) y (idx, año) del rango, ya ordenados por línea; una búsqueda por línea."""
+    months: List[Tuple[int, str]] = []
+    years: List[Tuple[int, str]] = []
+    for i in range(start_idx, end_idx):
+        if (mes := search_month(lines[i])):
+            months.append((i, mes))
+        if (my := YEAR_PATTERN.search(lines[i])):
+            years.append((i, my.group(1)))
+    return months, years
+
+def _closest_month_year(months: List[Tuple[int, str]], years: List[Tuple[int, str]],
+                        forward_max: int, backward_max: Optional[int] = None) -> MonthYear:
+    """
+    Empareja cada mes con el año más cercano en una sola pasada (dos punteros).
+    Se prefiere el primer año en/tras el mes (hasta forward_max líneas). Si no hay:
+    - con backward_max, el último año anterior a <= backward_max líneas;
+    - sin backward_max, el más cercano en cualquier sentido (empate: el anterior).
+    Gana la menor distancia; en empate, el primer mes.
+    """
+    best_pair: MonthYear = (None, None); best_distance = 10**9
+    j = 0; n = len(years)
+    for mi, m in months:
+        while j < n and years[j][0] < mi:
+            j += 1
+        # years[j]: primer año en/tras el mes; years[j-1]: último año anterior
+        fwd = years[j] if j < n else None
+        back = years[j-1] if j > 0 else None
+        if fwd and fwd[0] - mi <= forward_max:
+            d, y = fwd[0] - mi, fwd[1]
+        elif backward_max is not None:
+            if not (back and mi - back[0] <= backward_max):
+                continue
+            d, y = mi - back[0], back[1]
+        elif back and (not fwd or mi - back[0] <= fwd[0] - mi):
+            d, y = mi - back[0], back[1]
+        elif fwd:
+            d, y = fwd[0] - mi, fwd[1]
+        else:
+            continue
+        if d < best_distance:
+            best_distance = d
+            best_pair = (m, y)
+    return best_pair
+
+def find_month_year_in_window(lines: List[str], start_idx: Optional[int] = None,
+                              lookahead: int = 12) -> MonthYear:
+    """Busca mes y año en un rango; tolera líneas separadas."""
+    L = len(lines)
+    if start_idx is None:
+        start_idx = 0
+    end_idx = min(L, start_idx + lookahead)
+    months, years = _scan_months_years(lines, start_idx, end_idx)
+    return _closest_month_year(months, years, forward_max=6, backward_max=3)
+
+def find_month_year_anywhere(lines: List[str]) -> MonthYear:
+    months, years = _scan_months_years(lines, 0, len(lines))
+    if not months or not years:
+        return (None, None)
+    return _closest_month_year(months, years, forward_max=8)
+
+def extract_periodo_mes_anio(lines: List[str]) -> Tuple[Optional[str], Optional[str], Optional[int]]:
+    """Devuelve ('mes', 'anio', idxPeriodo) si se deduce; si no, (None, None, None)."""
+    # La cabecera nunca pasa de PERIODO_MAX_LINE líneas: no se busca PERÍODO más abajo
+    idx = next((i for i, l in enumerate(islice(lines, PERIODO_MAX_LINE)) if RE_PERIODO.search(l)), None)
+    mes = anio = None
+    if idx is not None:
+        mes, anio = find_month_year_in_window(lines, idx, lookahead=12)
+        if mes and anio:
+            return (mes, anio, idx)
+    m2, y2 = find_month_year_anywhere(lines)
+    return (mes or m2, anio or y2, idx)
+
+def extract_days_near_period(lines: List[str], idx_period: Optional[int], target_month: str) -> List[int]:
+    """Busca días (números) asociados al mes en la ventana a partir de PERÍODO."""
+    days = []
+    if idx_period is None:
+        window = lines[:40]
+    else:
+        window = lines[idx_period: idx_period+12]
+    txt = "\n".join(window)
+    for m in RE_DAY_MONTH.finditer(txt):
+        d = m.group(1)
+        mon = m.group(2).lower()
+        # Normaliza 'setiembre' a 'septiembre'
+        if mon == 'setiembre': mon = 'septiembre'
+        if mon == target_month:
+            try:
+                days.append(int(d))
+            except:
+                pass
+    return sorted(set(days))
+
+def build_suffix(period_lines: List[str]) -> str:
+    """
+    Devuelve SIEMPRE 'DDMMYYYY' con día 01, sin guiones bajos,
+    tanto para mes completo como para periodos parciales.
+    """
+    mes, anio, idxp = extract_periodo_mes_anio(period_lines)
+    if not (mes and anio):
+        return 'SIN_FECHA'
+
+    mes_norm = mes.lower()
+    if mes_norm == 'setiembre':
+        mes_norm = 'septiembre'
+
+    mm = MONTHS_ES.get(mes_norm)
+    if not mm:
+        return 'SIN_FECHA'
+
+    # Formato compacto, sin guiones bajos:
+    return f"01{mm}{anio}"
+
+
+def detect_header(text: str) -> Optional[Dict[str, object]]:
+    """Extrae código, nombre, PERÍODO y NIF. None si no parece cabecera."""
+    U = text.upper()
+    header_tokens = 0
+    if "RECIBO DE NÓMINA" in U or "RECIBO DE NOMINA" in U:
+        header_tokens += 1
+    if RE_PERIODO.search(U):
+        header_tokens += 1
+
+    # Vía rápida (páginas de continuación): sin "RECIBO DE NÓMINA" ni "PERÍODO"
+    # solo puntúa con nombre + período, y el período exige algún mes y algún año.
+    if not header_tokens and not (MONTH_PATTERN.search(text) and YEAR_PATTERN.search(text)):
+        return None
+
+    codigo = nombre = periodo_str = nif = None
+
+    m = RE_CODE_NAME_BLOCK.search(text)
+    if m:
+        codigo = m.group(1)
+        nombre = m.group(3).strip()
+
+    # Líneas recortadas una sola vez; las ventanas superiores salen de ellas
+    lines = get_lines(text)
+    top60 = list(islice((l for l in lines if l), 60))
+    top50 = top60[:50]
+
+    generic_code = None
+    for mf in RE_TOP_FIELDS.finditer("\n".join(top50)):
+        if mf.lastgroup == 'nif':
+            nif = nif or mf.group('nif_val')
+        elif generic_code is None:
+            generic_code = mf.group('code')
+        if nif and generic_code:
+            break
+
+    mes, anio, _ = extract_periodo_mes_anio(lines)
+    if mes and anio:
+        # formato visible 'mes año' para el CSV
+        periodo_str = f"{mes} {anio}"
+
+    # Fallbacks
+    if not codigo:
+        for l in top50:
+            ma = RE_AFILIACION.search(l)
+            if ma:
+                codigo = ma.group(1)[:6]; break
+        if not codigo:
+            codigo = generic_code
+
+    if not nombre:
+        # Líneas en mayúsculas de 2+ palabras: primero la que tenga coma, si no la más larga
+        ups = [l for l in top60 if l.isupper() and RE_INNER_SPACE.search(l)]
+        nombre = next((l for l in ups if "," in l), None) or max(ups, key=len, default=None)
+
+    score = (1 if header_tokens>=1 else 0) + (1 if nombre else 0) + (1 if periodo_str else 0)
+    if score >= 2:
+        return {
+            'codigo':  codigo or 'SIN_CODIGO',
+            'nombre':  nombre or 'SIN_NOMBRE',
+            'periodo': periodo_str or 'SIN_PERIODO',
+            'nif':     nif or 'SIN_NIF',
+            'lines':   lines
+        }
+    return None
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+Textos de la interfaz del validador, por idioma
+
+PDFValidatorApp elige el diccionario con su parámetro lang; todos los textos
+visibles salen de aquí para mantener una única implementación de la GUI.
+"""
+
+LANG = {
+    'es': {
+        'title': "Herramienta de Validación de Nóminas PDF",
+        'info': (
+            "Esta herramienta valida que los nombres de archivo de las nóminas PDF\n"
+            "divididas coincidan con su contenido\n\n"
+            "Contenido de validación：\n"
+            "• El código del archivo coincide con el código del PDF\n"
+            "• El nombre del archivo coincide con el nombre del PDF\n\n"
+            "Se generará un reporte Excel con marcas de color：\n"
+            "• Verde = Coincide ✓\n"
+            "• Rojo = No coincide ✗"
+        ),
+        'select_btn': "Seleccionar carpeta de PDFs",
+        'select_dialog': "Seleccionar carpeta que contiene archivos PDF",
+        'progress': "Validando: {current}/{total} - {filename}",
+        'validating': "Validando...",
+        'error_title': "Error",
+        'error_msg': "Error durante la validación:\n{error}",
+        'failed': "Validación fallida",
+        'warning_title': "Advertencia",
+        'no_pdfs_msg': "¡No se encontraron archivos PDF!",
+        'no_pdfs_status': "No se encontraron archivos PDF",
+        'done_msg': (
+            "¡Validación completada!\n\n"
+            "Total de archivos: {total}\n"
+            "Coinciden: {matched}\n"
+            "No coinciden: {unmatched}\n"
+            "Tasa de coincidencia: {rate:.1f}%\n\n"
+            "Reporte guardado en:\n{report_path}"
+        ),
+        'done_title': "Validación completada",
+        'done_status': "Validación completada - {matched}/{total} coinciden",
+        'open_title': "Abrir reporte",
+        'open_msg': "¿Desea abrir el reporte Excel?",
+    },
+    'zh': {
+        'title': "PDF工资单验证工具",
+        'info': (
+            "此工具用于验证拆分后的PDF工资单文件名\n"
+            "与其内容是否匹配\n\n"
+            "验证内容：\n"
+            "• 文件名中的编号与PDF中的编号是否一致\n"
+            "• 文件名中的姓名与PDF中的姓名是否一致\n\n"
+            "将生成带颜色标记的Excel报告：\n"
+            "• 绿色 = 匹配 ✓\n"
+            "• 红色 = 不匹配 ✗"
+        ),
+        'select_btn': "选择PDF文件夹",
+        'select_dialog': "选择包含PDF文件的文件夹",
+        'progress': "正在验证: {current}/{total} - {filename}",
+        'validating': "正在验证...",
+        'error_title': "错误",
+        'error_msg': "验证过程中出错:\n{error}",
+        'failed': "验证失败",
+        'warning_title': "警告",
+        'no_pdfs_msg': "未找到PDF文件！",
+        'no_pdfs_status': "未找到PDF文件",
+        'done_msg': (
+            "验证完成！\n\n"
+            "文件总数: {total}\n"
+            "匹配: {matched}\n"
+            "不匹配: {unmatched}\n"
+            "匹配率: {rate:.1f}%\n\n"
+            "报告已保存至:\n{report_path}"
+        ),
+        'done_title': "验证完成",
+        'done_status': "验证完成 - {matched}/{total} 匹配",
+        'open_title': "打开报告",
+        'open_msg': "是否打开Excel报告？",
+    },
+}
@@ -10,27 +10,39 @@ Funcionalidades:
 """
 
 import os
+import sys
+import threading
+import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 from datetime import datetime
 
-# 导入核心验证模块
-from validator_core import validate_folder, generate_excel_report
+from tk_events import TkEventChannel
+from i18n import LANG
+
+PROGRESS_INTERVAL = 0.1  # segundos mínimos entre actualizaciones de progreso
 
 
 # ===== GUI应用 =====
 class PDFValidatorApp:
-    def __init__(self, root):
+    def __init__(self, root, lang='es'):
         self.root = root
-        self.root.title("Herramienta de Validación de Nóminas PDF")
+        self.T = LANG[lang]
+        self.root.title(self.T['title'])
         self.root.geometry("600x400")
         self.root.resizable(False, False)
 
         self.folder_path = None
         self.results = None
+        self.worker = None
+        self._last_tick = 0.0
+        self._progress_total = None
 
         self.setup_ui()
 
+        # Canal por el que el hilo de validación notifica al hilo de Tk
+        self.events = TkEventChannel(self.root, self.handle_event)
+
     def setup_ui(self):
         # 标题
         title_frame = tk.Frame(self.root, bg="#4472C4", height=60)
@@ -39,7 +51,7 @@ class PDFValidatorApp:
 
         title_label = tk.Label(
             title_frame,
-            text="Herramienta de Validación de Nóminas PDF",
+            text=self.T['title'],
             font=("Arial", 18, "bold"),
             bg="#4472C4",
             fg="white"
@@ -51,20 +63,9 @@ class PDFValidatorApp:
         main_frame.pack(fill=tk.BOTH, expand=True)
 
         # Texto de descripción
-        info_text = (
-            "Esta herramienta valida que los nombres de archivo de las nóminas PDF\n"
-            "divididas coincidan con su contenido\n\n"
-            "Contenido de validación：\n"
-            "• El código del archivo coincide con el código del PDF\n"
-            "• El nombre del archivo coincide con el nombre del PDF\n\n"
-            "Se generará un reporte Excel con marcas de color：\n"
-            "• Verde = Coincide ✓\n"
-            "• Rojo = No coincide ✗"
-        )
-
         info_label = tk.Label(
             main_frame,
-            text=info_text,
+            text=self.T['info'],
             justify=tk.LEFT,
             font=("Arial", 10),
             bg="white"
@@ -72,9 +73,9 @@ class PDFValidatorApp:
         info_label.pack(pady=(0, 20))
 
         # Botón de selección de carpeta
-        select_btn = tk.Button(
+        self.select_btn = tk.Button(
             main_frame,
-            text="Seleccionar carpeta de PDFs",
+            text=self.T['select_btn'],
             command=self.select_folder,
             font=("Arial", 12, "bold"),
             bg="#4472C4",
@@ -83,7 +84,7 @@ class PDFValidatorApp:
             pady=10,
             cursor="hand2"
         )
-        select_btn.pack(pady=10)
+        self.select_btn.pack(pady=10)
 
         # 进度显示
         self.progress_label = tk.Label(
@@ -112,78 +113,121 @@ class PDFValidatorApp:
         self.status_label.pack(pady=10)
 
     def select_folder(self):
-        folder = filedialog.askdirectory(title="Seleccionar carpeta que contiene archivos PDF")
+        if self.worker is not None and self.worker.is_alive():
+            return
+        folder = filedialog.askdirectory(title=self.T['select_dialog'])
         if folder:
             self.folder_path = folder
             self.validate_pdfs()
 
     def update_progress(self, current, total, filename):
+        """Notificar progreso (se llama desde el hilo de validación)"""
+        # Como mucho una actualización cada PROGRESS_INTERVAL; la última siempre se envía
+        now = time.monotonic()
+        if now - self._last_tick < PROGRESS_INTERVAL and current < total:
+            return
+        self._last_tick = now
+        self.events.put('progress', current, total, filename)
+
+    def show_progress(self, current, total, filename):
         """Actualizar visualización de progreso"""
-        self.progress_bar['maximum'] = total
+        if total != self._progress_total:
+            self._progress_total = total
+            self.progress_bar['maximum'] = total
         self.progress_bar['value'] = current
-        self.progress_label.config(text=f"Validando: {current}/{total} - {filename}")
-        self.root.update_idletasks()
+        self.progress_label.config(
+            text=self.T['progress'].format(current=current, total=total, filename=filename)
+        )
 
     def validate_pdfs(self):
         if not self.folder_path:
             return
 
         # Reiniciar visualización
+        self._last_tick = 0.0
         self.progress_bar['value'] = 0
-        self.status_label.config(text="Validando...", fg="#007ACC")
-        self.root.update_idletasks()
+        self.status_label.config(text=self.T['validating'], fg="#007ACC")
+        self.select_btn.config(state=tk.DISABLED)
+
+        self.worker = threading.Thread(
+            target=self.run_validation,
+            args=(self.folder_path,),
+            daemon=True
+        )
+        self.worker.start()
 
+    def run_validation(self, folder_path):
+        """Validación y generación del reporte en segundo plano"""
         try:
-            # Ejecutar validación
-            self.results = validate_folder(self.folder_path, self.update_progress)
-
-            if not self.results:
-                messagebox.showwarning("Advertencia", "¡No se encontraron archivos PDF!")
-                self.status_label.config(text="No se encontraron archivos PDF", fg="#FF0000")
-                return
-
-            # Generar reporte Excel
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_path = os.path.join(
-                self.folder_path,
-                f"Reporte_Validacion_{timestamp}.xlsx"
-            )
-
-            generate_excel_report(self.results, report_path)
-
-            # Mostrar resultados
-            total = len(self.results)
-            matched = sum(1 for r in self.results if r['overall_match'])
-            unmatched = total - matched
-
-            result_msg = (
-                f"¡Validación completada!\n\n"
-                f"Total de archivos: {total}\n"
-                f"Coinciden: {matched}\n"
-                f"No coinciden: {unmatched}\n"
-                f"Tasa de coincidencia: {matched/total*100:.1f}%\n\n"
-                f"Reporte guardado en:\n{report_path}"
-            )
-
-            messagebox.showinfo("Validación completada", result_msg)
-            self.status_label.config(
-                text=f"Validación completada - {matched}/{total} coinciden",
-                fg="#00AA00" if matched == total else "#FF6600"
-            )
-
-            # Preguntar si abrir el reporte
-            if messagebox.askyesno("Abrir reporte", "¿Desea abrir el reporte Excel?"):
-                os.system(f'xdg-open "{report_path}"' if os.name != 'nt' else f'start excel "{report_path}"')
+            # 导入核心验证模块（延迟到首次验证：fitz/openpyxl 不拖慢窗口启动）
+            from validator_core import validate_folder, generate_excel_report_fast
 
+            # Ejecutar validación
+            results = validate_folder(folder_path, self.update_progress)
+
+            report_path = None
+            if results:
+                # Generar reporte Excel
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                report_path = os.path.join(
+                    folder_path,
+                    f"Reporte_Validacion_{timestamp}.xlsx"
+                )
+                generate_excel_report_fast(results, report_path)
+
+            self.events.put('done', results, report_path)
         except Exception as e:
-            messagebox.showerror("Error", f"Error durante la validación:\n{str(e)}")
-            self.status_label.config(text="Validación fallida", fg="#FF0000")
+            self.events.put('error', e)
+
+    def handle_event(self, kind, *args):
+        """Procesar eventos del hilo de validación en el hilo de Tk"""
+        if kind == 'progress':
+            self.show_progress(*args)
+        elif kind == 'done':
+            self.select_btn.config(state=tk.NORMAL)
+            self.show_results(*args)
+        elif kind == 'error':
+            self.select_btn.config(state=tk.NORMAL)
+            messagebox.showerror(self.T['error_title'], self.T['error_msg'].format(error=args[0]))
+            self.status_label.config(text=self.T['failed'], fg="#FF0000")
+
+    def show_results(self, results, report_path):
+        self.results = results
+
+        if not self.results:
+            messagebox.showwarning(self.T['warning_title'], self.T['no_pdfs_msg'])
+            self.status_label.config(text=self.T['no_pdfs_status'], fg="#FF0000")
+            return
+
+        # Mostrar resultados
+        total = len(self.results)
+        matched = sum(1 for r in self.results if r['overall_match'])
+        unmatched = total - matched
+
+        result_msg = self.T['done_msg'].format(
+            total=total,
+            matched=matched,
+            unmatched=unmatched,
+            rate=matched/total*100,
+            report_path=report_path
+        )
+
+        messagebox.showinfo(self.T['done_title'], result_msg)
+        self.status_label.config(
+            text=self.T['done_status'].format(matched=matched, total=total),
+            fg="#00AA00" if matched == total else "#FF6600"
+        )
+
+        # Preguntar si abrir el reporte
+        if messagebox.askyesno(self.T['open_title'], self.T['open_msg']):
+            os.system(f'xdg-open "{report_path}"' if os.name != 'nt' else f'start excel "{report_path}"')
 
 
 def main():
-    """Función principal"""
+    """Función principal (idioma opcional como argumento: es | zh)"""
+    lang = sys.argv[1] if len(sys.argv) > 1 and sys.argv[1] in LANG else 'es'
     root = tk.Tk()
-    app = PDFValidatorApp(root)
+    app = PDFValidatorApp(root, lang)
     root.mainloop()
 
 
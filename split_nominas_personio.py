@@ -12,204 +12,35 @@ Cambios:
 
 Requisitos:
   pip install pymupdf
+  pip install rapidfuzz   (opcional: acelera la comparación con ejemplos)
+  pip install pyahocorasick   (opcional: acelera la búsqueda de meses)
 """
 
 import os
 import re
 import csv
-import difflib
-import unicodedata
-import calendar
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
 import tkinter as tk
-from tkinter import filedialog, messagebox
-import fitz  # PyMuPDF
+from tkinter import filedialog, messagebox, ttk
+
+from tk_events import TkEventChannel
+from header_detect import sane, build_suffix, detect_header
 
 # ===== Config (no se preguntan estos modos) =====
 STRICT_MODE = False          # Heurístico
 MERGE_DUP_HEADERS = True     # Fusionar cabeceras iguales consecutivas
 DEBUG_MODE = False           # Cambiar a True para volcados por página (debug_text/)
+DIFF_MAX_EDITS = 200         # Tope de la distancia de edición informada en el CSV
+PAGE_WORKERS = None          # Procesos para extraer/analizar páginas (None = os.cpu_count())
+PARALLEL_MIN_PAGES = 64      # Por debajo, el arranque del pool no compensa: se hace en serie
+PROGRESS_INTERVAL = 0.1      # Segundos mínimos entre actualizaciones de progreso en la UI
+
+_WS_RE = re.compile(r"\s+")
 
-# ===== Patrones y utilidades =====
-MONTHS_ES = {
-    'enero': '01','febrero': '02','marzo': '03','abril': '04','mayo': '05','junio': '06',
-    'julio': '07','agosto': '08','septiembre': '09','setiembre': '09','octubre': '10',
-    'noviembre': '11','diciembre': '12'
-}
-MONTH_PATTERN = re.compile(r"(?i)\b(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|octubre|noviembre|diciembre)\b")
-YEAR_PATTERN  = re.compile(r"\b(20\d{2})\b")
-
-RE_CODE_NAME_BLOCK = re.compile(r"\n\s*(\d{2,6})\/(\d)\s*\n\s*([A-ZÁÉÍÓÚÜÑ ,.'\-]+?)\s*\n")
-RE_PERIODO = re.compile(r"(?i)per[ií]odo")
-RE_DAY_MONTH = re.compile(r"\b(\d{1,2})\s+(enero|febrero|marzo|abril|mayo|junio|julio|agosto|septiembre|setiembre|octubre|noviembre|diciembre)\b", re.I)
-RE_NIF = re.compile(r"(?i)\b(NIF|DNI|N\.I\.F\.)\b\s*[:\-]?\s*([A-Z0-9]{5,})")
-RE_AFILIACION = re.compile(r"(?i)afiliaci[oó]n\s*s\.s\.\s*\n\s*([0-9]{3,12})")
-RE_GENERIC_CODE = re.compile(r"\b\d{3,6}\b")
-
-def strip_accents(s: str) -> str:
-    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
-
-def sane(s: str) -> str:
-    s = strip_accents(s)
-    s = re.sub(r"[^A-Za-z0-9_\-]", "_", s)
-    return re.sub(r"_+", "_", s).strip("._")[:200]
-
-def get_lines(text: str):
-    return [l.strip() for l in text.splitlines()]
-
-def get_top_lines(text: str, n=25):
-    return [l for l in get_lines(text) if l.strip()][:n]
-
-def find_month_year_in_window(lines, start_idx=None, lookahead=12):
-    """Busca mes y año en un rango; tolera líneas separadas."""
-    L = len(lines)
-    if start_idx is None:
-        start_idx = 0
-    end_idx = min(L, start_idx + lookahead)
-    months = [(i, MONTH_PATTERN.search(lines[i]).group(1))
-              for i in range(start_idx, end_idx) if MONTH_PATTERN.search(lines[i])]
-    years  = [(i, YEAR_PATTERN.search(lines[i]).group(1))
-              for i in range(start_idx, end_idx) if YEAR_PATTERN.search(lines[i])]
-    best_pair = (None, None); best_distance = 10**9
-    for mi, m in months:
-        forward  = [(yi, y) for yi, y in years if yi >= mi and (yi - mi) <= 6]
-        backward = [(yi, y) for yi, y in years if yi < mi and (mi - yi) <= 3]
-        candidates = forward or backward
-        for yi, y in candidates:
-            d = abs(yi - mi)
-            if d < best_distance:
-                best_distance = d
-                best_pair = (m, y)
-    return best_pair
-
-def find_month_year_anywhere(lines):
-    months = [(i, MONTH_PATTERN.search(lines[i]).group(1)) for i in range(len(lines)) if MONTH_PATTERN.search(lines[i])]
-    years  = [(i, YEAR_PATTERN.search(lines[i]).group(1)) for i in range(len(lines)) if YEAR_PATTERN.search(lines[i])]
-    if not months or not years:
-        return (None, None)
-    best_pair = (None, None); best_distance = 10**9
-    for mi, m in months:
-        forward = [(yi, y) for yi, y in years if yi >= mi and (yi - mi) <= 8]
-        pool = forward or years
-        for yi, y in pool:
-            d = abs(yi - mi)
-            if d < best_distance:
-                best_distance = d
-                best_pair = (m, y)
-    return best_pair
-
-def extract_periodo_mes_anio(lines):
-    """Devuelve ('mes', 'anio', idxPeriodo) si se deduce; si no, (None, None, None)."""
-    idx = None
-    for i, l in enumerate(lines):
-        if RE_PERIODO.search(l):
-            idx = i; break
-    mes = anio = None
-    if idx is not None:
-        mes, anio = find_month_year_in_window(lines, idx, lookahead=12)
-    if not (mes and anio):
-        m2, y2 = find_month_year_anywhere(lines)
-        mes = mes or m2; anio = anio or y2
-    return (mes, anio, idx)
-
-def extract_days_near_period(lines, idx_period, target_month):
-    """Busca días (números) asociados al mes en la ventana a partir de PERÍODO."""
-    days = []
-    if idx_period is None:
-        window = lines[:40]
-    else:
-        window = lines[idx_period: idx_period+12]
-    txt = "\n".join(window)
-    for m in RE_DAY_MONTH.finditer(txt):
-        d = m.group(1)
-        mon = m.group(2).lower()
-        # Normaliza 'setiembre' a 'septiembre'
-        if mon == 'setiembre': mon = 'septiembre'
-        if mon == target_month:
-            try:
-                days.append(int(d))
-            except:
-                pass
-    return sorted(set(days))
-
-def build_suffix(period_lines):
-    """
-    Devuelve SIEMPRE 'DDMMYYYY' con día 01, sin guiones bajos,
-    tanto para mes completo como para periodos parciales.
-    """
-    mes, anio, idxp = extract_periodo_mes_anio(period_lines)
-    if not (mes and anio):
-        return 'SIN_FECHA'
-
-    mes_norm = mes.lower()
-    if mes_norm == 'setiembre':
-        mes_norm = 'septiembre'
-
-    mm = MONTHS_ES.get(mes_norm)
-    if not mm:
-        return 'SIN_FECHA'
-
-    # Formato compacto, sin guiones bajos:
-    return f"01{mm}{anio}"
-
-
-def detect_header(text: str):
-    """Extrae código, nombre, PERÍODO y NIF. None si no parece cabecera."""
-    U = text.upper()
-    header_tokens = 0
-    if "RECIBO DE NÓMINA" in U or "RECIBO DE NOMINA" in U:
-        header_tokens += 1
-    if RE_PERIODO.search(U):
-        header_tokens += 1
-
-    codigo = nombre = periodo_str = nif = None
-
-    m = RE_CODE_NAME_BLOCK.search(text)
-    if m:
-        codigo = m.group(1)
-        nombre = m.group(3).strip()
-
-    for l in get_top_lines(text, 50):
-        mn = RE_NIF.search(l)
-        if mn and not nif:
-            nif = mn.group(2).strip()
-
-    lines = get_lines(text)
-    mes, anio, _ = extract_periodo_mes_anio(lines)
-    if mes and anio:
-        # formato visible 'mes año' para el CSV
-        periodo_str = f"{mes} {anio}"
-
-    # Fallbacks
-    if not codigo:
-        for l in get_top_lines(text, 50):
-            ma = RE_AFILIACION.search(l)
-            if ma:
-                codigo = ma.group(1)[:6]; break
-        if not codigo:
-            for l in get_top_lines(text, 50):
-                mg = RE_GENERIC_CODE.search(l)
-                if mg:
-                    codigo = mg.group(); break
-
-    if not nombre:
-        cands = [l for l in get_top_lines(text, 60) if l.isupper() and "," in l and len(l.split())>=2]
-        if cands:
-            nombre = cands[0]
-        else:
-            ups = [l for l in get_top_lines(text, 60) if l.isupper() and len(l.split())>=2]
-            if ups:
-                nombre = sorted(ups, key=len, reverse=True)[0]
-
-    score = (1 if header_tokens>=1 else 0) + (1 if nombre else 0) + (1 if periodo_str else 0)
-    if score >= 2:
-        return {
-            'codigo':  codigo or 'SIN_CODIGO',
-            'nombre':  nombre or 'SIN_NOMBRE',
-            'periodo': periodo_str or 'SIN_PERIODO',
-            'nif':     nif or 'SIN_NIF',
-            'lines':   lines
-        }
-    return None
 
 def split_name(nombre_completo: str):
     if not nombre_completo or nombre_completo=='SIN_NOMBRE':
@@ -221,27 +52,59 @@ def split_name(nombre_completo: str):
     return nombre_completo, ''
 
 def normalize_text_for_diff(t: str) -> str:
-    return re.sub(r"\s+", " ", t).strip()
-
-def compare_pdfs(p1: str, p2: str):
-    def extract(path):
-        out = []
-        with fitz.open(path) as d:
-            for pg in d:
-                out.append(normalize_text_for_diff(pg.get_text('text')))
-        return "\n".join(out)
-    a = extract(p1); b = extract(p2)
+    return _WS_RE.sub(" ", t).strip()
+
+# fitz (PyMuPDF), rapidfuzz y difflib se importan al usarse: la ventana de
+# instrucciones aparece sin esperar a cargar sus librerías nativas.
+@lru_cache(maxsize=None)
+def _levenshtein():
+    try:
+        from rapidfuzz.distance import Levenshtein  # opcional: distancia de edición en C
+    except ImportError:
+        return None
+    return Levenshtein
+
+def extract_text_for_diff(path: str) -> str:
+    import fitz  # PyMuPDF
+    out = []
+    with fitz.open(path) as d:
+        for pg in d:
+            out.append(normalize_text_for_diff(pg.get_text('text')))
+    return "\n".join(out)
+
+def compare_pdfs(p1: str, p2: str, text1: str = None):
+    """Compara el texto de dos PDFs; text1 evita reabrir p1 si ya se conoce su texto."""
+    a = text1 if text1 is not None else extract_text_for_diff(p1)
+    b = extract_text_for_diff(p2)
     if a == b:
         return True, ''
+    Levenshtein = _levenshtein()
+    if Levenshtein is not None:
+        dist = Levenshtein.distance(a, b, score_cutoff=DIFF_MAX_EDITS)
+        if dist > DIFF_MAX_EDITS:
+            return False, f"editdist>{DIFF_MAX_EDITS}"
+        return False, f"editdist={dist}"
+    # Sin rapidfuzz: diff unificado (Python puro, lento en textos largos)
+    import difflib
     diff = difflib.unified_diff(b.splitlines(), a.splitlines(), lineterm='')
     return False, "\n".join(list(diff)[:60])
 
-def LOG(msg, log_list):
+def LOG(msg, log_file):
     print(msg)
-    log_list.append(msg)
+    log_file.write(msg + "\n")
+
+def index_examples(ex_dir):
+    """Indexa las rutas de los PDFs de ejemplo por prefijo (texto antes del primer '_'), una sola vez."""
+    ex_index = {}
+    if ex_dir:
+        with os.scandir(ex_dir) as it:
+            for e in it:
+                if '_' in e.name and e.name.lower().endswith('.pdf') and e.is_file():
+                    ex_index.setdefault(e.name.split('_', 1)[0], []).append(e.path)
+    return ex_index
 
 # ----- Guardado de bloque -----
-def save_block(doc, pages_idx, cabecera, out_dir, ex_dir, rows, log):
+def save_block(doc, pages_idx, cabecera, out_dir, ex_dir, ex_index, csv_writer, log, page_text_cache):
     ap, no = split_name(cabecera['nombre'])
     # Sufijo de fecha SOLO (según reglas)
     suffix = build_suffix(cabecera['lines'])  # '01092025' o '01_02_2025' o 'SIN_FECHA'
@@ -250,9 +113,11 @@ def save_block(doc, pages_idx, cabecera, out_dir, ex_dir, rows, log):
     fname = f"{sane(base_id)}_{sane(ap)}_{sane(no)}_Payslip_{sane(suffix)}.pdf"
     out_pdf = os.path.join(out_dir, fname)
 
+    # Los bloques son siempre páginas consecutivas: una sola inserción por rango
+    assert pages_idx == list(range(pages_idx[0], pages_idx[-1] + 1))
+    import fitz  # PyMuPDF
     with fitz.open() as newdoc:
-        for p in pages_idx:
-            newdoc.insert_pdf(doc, from_page=p, to_page=p)
+        newdoc.insert_pdf(doc, from_page=pages_idx[0], to_page=pages_idx[-1])
         newdoc.save(out_pdf)
 
     # Comparación con ejemplo
@@ -261,109 +126,231 @@ def save_block(doc, pages_idx, cabecera, out_dir, ex_dir, rows, log):
         exact = os.path.join(ex_dir, os.path.basename(out_pdf))
         alt = None
         if not os.path.exists(exact):
-            pref = f"{sane(base_id)}_"
-            for candf in os.listdir(ex_dir):
-                if candf.startswith(pref) and candf.lower().endswith('.pdf'):
-                    alt = os.path.join(ex_dir, candf); break
+            cands = ex_index.get(sane(base_id))
+            if cands:
+                alt = cands[0]
         example = exact if os.path.exists(exact) else alt
         if example and os.path.exists(example):
-            eq, d = compare_pdfs(out_pdf, example)
+            # El texto del bloque ya se extrajo en el bucle principal
+            text1 = "\n".join(normalize_text_for_diff(page_text_cache[p]) for p in pages_idx)
+            eq, d = compare_pdfs(out_pdf, example, text1)
             comp = 'OK' if eq else 'DIFERENTE'
             diff = d
 
-    rows.append([os.path.basename(out_pdf), base_id, cabecera['nombre'], cabecera['periodo'], len(pages_idx), comp, diff])
+    for p in pages_idx:
+        page_text_cache.pop(p, None)
+
+    csv_writer.writerow([os.path.basename(out_pdf), base_id, cabecera['nombre'], cabecera['periodo'], len(pages_idx), comp, diff])
     LOG(f"Guardado: {os.path.basename(out_pdf)} (páginas: {len(pages_idx)})", log)
     return out_pdf
 
-# ===== UI: ventanas =====
-root = tk.Tk(); root.withdraw()
-messagebox.showinfo(
-    "Instrucciones",
-    "1) Selecciona el PDF consolidado de nóminas.\n"
-    "2) Selecciona la carpeta de salida para los PDFs individuales.\n"
-    "3) (Opcional) Carpeta con nóminas de ejemplo para comparar."
-)
-
-pdf_path = filedialog.askopenfilename(title="Selecciona el PDF consolidado", filetypes=[("PDF", "*.pdf")])
-if not pdf_path:
-    messagebox.showerror("Error", "No se seleccionó PDF."); raise SystemExit(1)
-
-out_dir = filedialog.askdirectory(title="Selecciona la carpeta de salida")
-if not out_dir:
-    messagebox.showerror("Error", "No se seleccionó carpeta de salida."); raise SystemExit(1)
-
-ex_dir = filedialog.askdirectory(title="(Opcional) Carpeta con nóminas de ejemplo (Cancelar si no hay)")
-if not ex_dir:
-    ex_dir = None
-
-csv_path = os.path.join(out_dir, 'resumen_nominas.csv')
-log_path = os.path.join(out_dir, 'log_nominas.txt')
-if DEBUG_MODE:
-    dbg_dir = os.path.join(out_dir, 'debug_text')
-    os.makedirs(dbg_dir, exist_ok=True)
+# ===== Extracción por página (paralelizable) =====
+_worker_doc = None  # documento abierto una vez en cada proceso del pool
 
-# ===== Proceso =====
-if not os.path.exists(pdf_path):
-    messagebox.showerror('Error', f'No existe: {pdf_path}'); raise SystemExit(1)
+def page_text(doc, idx):
+    # Sin referencia local a la página: MuPDF puede liberarla en cuanto se extrae
+    # el texto. Se mantienen los flags por defecto; TEXT_INHIBIT_SPACES pega
+    # "1 septiembre" -> "1septiembre" y rompe la detección del período.
+    return doc.load_page(idx).get_text('text') or ''
 
-log = []
-rows = []
+def _init_page_worker(pdf_path):
+    global _worker_doc
+    import fitz  # PyMuPDF
+    _worker_doc = fitz.open(pdf_path)
 
-try:
-    with fitz.open(pdf_path) as doc:
-        current = None
-        pages = []
+def _page_info(idx):
+    text = page_text(_worker_doc, idx)
+    return idx, detect_header(text), text
 
+def iter_page_info(doc, pdf_path):
+    """
+    Genera (idx, cabecera o None, texto) en orden de página.
+    Con muchas páginas reparte extracción + detect_header entre procesos;
+    el ensamblado de bloques sigue siendo secuencial en quien consume.
+    """
+    workers = PAGE_WORKERS or os.cpu_count() or 1
+    if workers < 2 or doc.page_count < PARALLEL_MIN_PAGES:
         for idx in range(doc.page_count):
-            page = doc[idx]
-            text = page.get_text('text') or ''
-            if DEBUG_MODE:
-                dbg_dir = os.path.join(out_dir, 'debug_text'); os.makedirs(dbg_dir, exist_ok=True)
-                with open(os.path.join(dbg_dir, f'page_{idx+1:04d}.txt'), 'w', encoding='utf-8') as f:
-                    f.write(text)
-
-            cand = detect_header(text)
-            has_header = cand is not None
-
-            # Heurístico + Fusión
-            if has_header:
-                if current is not None and pages:
-                    same = MERGE_DUP_HEADERS and cand and current and \
-                           (cand['codigo'] == current['codigo']) and \
-                           ( (cand['periodo'] or '') == (current['periodo'] or '') )
-                    if same:
-                        pages.append(idx)
-                        LOG(f"{idx+1:04d}: cabecera repetida fusionada con {current['codigo']}", log)
-                        continue
-                    # Guardar bloque anterior y abrir nuevo
-                    save_block(doc, pages, current, out_dir, ex_dir, rows, log)
-                    current = None; pages = []
-                current = cand; pages = [idx]
-                LOG(f"{idx+1:04d}: inicio -> {current['codigo']} | {current['nombre']} | {current['periodo']}", log)
-            else:
-                if current is not None:
-                    pages.append(idx)
-                    LOG(f"{idx+1:04d}: continuación de {current['codigo']}", log)
+            text = page_text(doc, idx)
+            yield idx, detect_header(text), text
+        return
+
+    # 'spawn': no se hace fork de un proceso con Tk e hilos activos
+    ex = ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_page_worker,
+        initargs=(pdf_path,)
+    )
+    try:
+        yield from ex.map(_page_info, range(doc.page_count), chunksize=16)
+    finally:
+        ex.shutdown(cancel_futures=True)
+
+# ===== Proceso =====
+def split_pdf(pdf_path, out_dir, ex_dir=None, progress_callback=None):
+    """
+    Divide el PDF consolidado en nóminas individuales y escribe CSV resumen y log.
+    progress_callback(pagina, total) se invoca desde el hilo llamante cuando la página
+    ya se ha extraído y analizado (quizá en un proceso de trabajo), antes de asignarla
+    a un bloque.
+    Retorna (csv_path, log_path, total_bloques).
+    """
+    csv_path = os.path.join(out_dir, 'resumen_nominas.csv')
+    log_path = os.path.join(out_dir, 'log_nominas.txt')
+    if DEBUG_MODE:
+        dbg_dir = os.path.join(out_dir, 'debug_text')
+        os.makedirs(dbg_dir, exist_ok=True)
+
+    ex_index = index_examples(ex_dir)
+    n_blocks = 0
+
+    # CSV y log se escriben a medida que se guardan bloques (sin acumular en memoria)
+    with open(csv_path, 'w', newline='', encoding='utf-8') as csv_file, \
+         open(log_path, 'w', encoding='utf-8') as log:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow(["archivo","codigo","nombre","periodo","paginas","comparacion","diferencias"])
+
+        import fitz  # PyMuPDF
+        with fitz.open(pdf_path) as doc:
+            current = None
+            pages = []
+            page_text_cache = {}  # índice de página -> texto, hasta guardar su bloque
+
+            for idx, cand, text in iter_page_info(doc, pdf_path):
+                if progress_callback:
+                    progress_callback(idx + 1, doc.page_count)
+
+                page_text_cache[idx] = text
+                if DEBUG_MODE:
+                    dbg_dir = os.path.join(out_dir, 'debug_text'); os.makedirs(dbg_dir, exist_ok=True)
+                    with open(os.path.join(dbg_dir, f'page_{idx+1:04d}.txt'), 'w', encoding='utf-8') as f:
+                        f.write(text)
+
+                has_header = cand is not None
+
+                # Heurístico + Fusión
+                if has_header:
+                    if current is not None and pages:
+                        same = MERGE_DUP_HEADERS and cand and current and \
+                               (cand['codigo'] == current['codigo']) and \
+                               ( (cand['periodo'] or '') == (current['periodo'] or '') )
+                        if same:
+                            pages.append(idx)
+                            LOG(f"{idx+1:04d}: cabecera repetida fusionada con {current['codigo']}", log)
+                            continue
+                        # Guardar bloque anterior y abrir nuevo
+                        save_block(doc, pages, current, out_dir, ex_dir, ex_index, csv_writer, log, page_text_cache)
+                        n_blocks += 1; csv_file.flush(); log.flush()
+                        current = None; pages = []
+                    current = cand; pages = [idx]
+                    LOG(f"{idx+1:04d}: inicio -> {current['codigo']} | {current['nombre']} | {current['periodo']}", log)
                 else:
-                    LOG(f"{idx+1:04d}: huérfana (sin cabecera y sin bloque activo)", log)
+                    if current is not None:
+                        pages.append(idx)
+                        LOG(f"{idx+1:04d}: continuación de {current['codigo']}", log)
+                    else:
+                        page_text_cache.pop(idx, None)
+                        LOG(f"{idx+1:04d}: huérfana (sin cabecera y sin bloque activo)", log)
+
+            # Guardar último bloque
+            if current is not None and pages:
+                save_block(doc, pages, current, out_dir, ex_dir, ex_index, csv_writer, log, page_text_cache)
+                n_blocks += 1
 
-        # Guardar último bloque
-        if current is not None and pages:
-            save_block(doc, pages, current, out_dir, ex_dir, rows, log)
+        log.write(f"\nTotal bloques: {n_blocks}\n")
 
-    # Escribir CSV y log
-    with open(csv_path, 'w', newline='', encoding='utf-8') as f:
-        w = csv.writer(f)
-        w.writerow(["archivo","codigo","nombre","periodo","paginas","comparacion","diferencias"])
-        w.writerows(rows)
+    return csv_path, log_path, n_blocks
 
-    with open(log_path, 'w', encoding='utf-8') as f:
-        for l in log:
-            f.write(l + "\n")
-        f.write(f"\nTotal bloques: {len(rows)}\n")
 
-    messagebox.showinfo('Completado', f"Total nóminas: {len(rows)}\nResumen: {csv_path}\nLog: {log_path}")
+class SplitWorker(threading.Thread):
+    """Ejecuta split_pdf fuera del hilo de Tk y publica eventos en el canal"""
 
-except Exception as e:
-    messagebox.showerror('Error', f'Se produjo un error: {e}')
-    raise
\ No newline at end of file
+    def __init__(self, pdf_path, out_dir, ex_dir, events):
+        super().__init__(daemon=True)
+        self.pdf_path = pdf_path
+        self.out_dir = out_dir
+        self.ex_dir = ex_dir
+        self.events = events
+        self._last_tick = 0.0
+
+    def report_progress(self, current, total):
+        # Como mucho una actualización cada PROGRESS_INTERVAL; la última siempre se envía
+        now = time.monotonic()
+        if now - self._last_tick < PROGRESS_INTERVAL and current < total:
+            return
+        self._last_tick = now
+        self.events.put('progress', current, total)
+
+    def run(self):
+        try:
+            result = split_pdf(self.pdf_path, self.out_dir, self.ex_dir, self.report_progress)
+            self.events.put('done', *result)
+        except Exception as e:
+            self.events.put('error', e)
+
+
+# ===== UI: ventanas =====
+def main():
+    root = tk.Tk(); root.withdraw()
+    messagebox.showinfo(
+        "Instrucciones",
+        "1) Selecciona el PDF consolidado de nóminas.\n"
+        "2) Selecciona la carpeta de salida para los PDFs individuales.\n"
+        "3) (Opcional) Carpeta con nóminas de ejemplo para comparar."
+    )
+
+    pdf_path = filedialog.askopenfilename(title="Selecciona el PDF consolidado", filetypes=[("PDF", "*.pdf")])
+    if not pdf_path:
+        messagebox.showerror("Error", "No se seleccionó PDF."); raise SystemExit(1)
+
+    out_dir = filedialog.askdirectory(title="Selecciona la carpeta de salida")
+    if not out_dir:
+        messagebox.showerror("Error", "No se seleccionó carpeta de salida."); raise SystemExit(1)
+
+    ex_dir = filedialog.askdirectory(title="(Opcional) Carpeta con nóminas de ejemplo (Cancelar si no hay)")
+    if not ex_dir:
+        ex_dir = None
+
+    if not os.path.exists(pdf_path):
+        messagebox.showerror('Error', f'No existe: {pdf_path}'); raise SystemExit(1)
+
+    # Ventana de progreso mientras el hilo de trabajo divide el PDF
+    root.title("Dividiendo nóminas")
+    root.resizable(False, False)
+    progress_label = tk.Label(root, text="Procesando...", padx=20, pady=10)
+    progress_label.pack()
+    progress_bar = ttk.Progressbar(root, mode='determinate', length=320)
+    progress_bar.pack(padx=20, pady=(0, 20))
+    root.deiconify()
+
+    failure = []
+
+    def handle_event(kind, *args):
+        if kind == 'progress':
+            cur, tot = args
+            progress_bar['maximum'] = tot
+            progress_bar['value'] = cur
+            progress_label.config(text=f"Procesando página {cur}/{tot}")
+        elif kind == 'done':
+            csv_path, log_path, total = args
+            events.close()
+            messagebox.showinfo('Completado', f"Total nóminas: {total}\nResumen: {csv_path}\nLog: {log_path}")
+            root.destroy()
+        elif kind == 'error':
+            events.close()
+            messagebox.showerror('Error', f'Se produjo un error: {args[0]}')
+            failure.append(args[0])
+            root.destroy()
+
+    events = TkEventChannel(root, handle_event)
+    SplitWorker(pdf_path, out_dir, ex_dir, events).start()
+    root.mainloop()
+
+    if failure:
+        raise failure[0]
+
+
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    main()
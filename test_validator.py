@@ -8,12 +8,20 @@ PDF验证工具 - 自动测试脚本
 import os
 import shutil
 import sys
+import tempfile
+
+# 测试必须真正解析PDF：在导入 validator_core 之前禁用提取结果缓存
+os.environ['SLIPT_VERIF_NO_CACHE'] = '1'
+
+import header_detect
+import validator_core
 from validator_core import (
     parse_filename,
     extract_pdf_info,
     compare_info,
     validate_folder,
-    generate_excel_report
+    generate_excel_report,
+    generate_excel_report_fast
 )
 
 
@@ -176,6 +184,34 @@ def test_3_comparison_logic():
 
     result_mismatch = compare_info(filename_info_mismatch, pdf_info_mismatch)
 
+    # 测试用例：名字不同（5个词中4个一致）不能判定为匹配
+    result_other_given = compare_info(
+        {'codigo': '809', 'nombre': 'MARTINEZ MONTERO LAURA MARIA JOSE'},
+        {'codigo': '809', 'nombre': 'MARTINEZ MONTERO, LAURA MARIA JOSEFA'}
+    )
+
+    # 测试用例：姓和名的顺序不同
+    result_reordered = compare_info(
+        {'codigo': '1004', 'nombre': 'GARCIA LOPEZ ANA'},
+        {'codigo': '1004', 'nombre': 'LOPEZ GARCIA, ANA'}
+    )
+    result_given_first = compare_info(
+        {'codigo': '809', 'nombre': 'LAURA MARIA MARTINEZ MONTERO'},
+        {'codigo': '809', 'nombre': 'MARTINEZ MONTERO, LAURA MARIA'}
+    )
+
+    # 测试用例：重复的姓氏不能被折叠（GARCIA GARCIA ≠ GARCIA）
+    result_repeated = compare_info(
+        {'codigo': '1003', 'nombre': 'GARCIA GARCIA LUIS'},
+        {'codigo': '1003', 'nombre': 'GARCIA, LUIS'}
+    )
+
+    # 测试用例：重复的姓氏在顺序不同时仍然匹配
+    result_repeated_reordered = compare_info(
+        {'codigo': '1003', 'nombre': 'GARCIA GARCIA LUIS'},
+        {'codigo': '1003', 'nombre': 'LUIS GARCIA, GARCIA'}
+    )
+
     # 验证结果
     checks = {
         '匹配场景-编号匹配': result_match['codigo_match'] == True,
@@ -183,7 +219,12 @@ def test_3_comparison_logic():
         '匹配场景-总体匹配': result_match['overall_match'] == True,
         '不匹配场景-编号不匹配': result_mismatch['codigo_match'] == False,
         '不匹配场景-姓名不匹配': result_mismatch['nombre_match'] == False,
-        '不匹配场景-总体不匹配': result_mismatch['overall_match'] == False
+        '不匹配场景-总体不匹配': result_mismatch['overall_match'] == False,
+        '名字不同场景-姓名不匹配': result_other_given['nombre_match'] == False,
+        '顺序不同场景-姓氏颠倒': result_reordered['nombre_match'] == True,
+        '顺序不同场景-名在前': result_given_first['nombre_match'] == True,
+        '重复姓氏场景-姓名不匹配': result_repeated['nombre_match'] == False,
+        '重复姓氏场景-顺序不同仍匹配': result_repeated_reordered['nombre_match'] == True
     }
 
     passed_count = 0
@@ -227,11 +268,14 @@ def test_4_integration():
         # 生成报告
         report_path = os.path.join(test_dir, 'test_report.xlsx')
         generate_excel_report(results, report_path)
+        fast_report_path = os.path.join(test_dir, 'test_report_fast.xlsx')
+        generate_excel_report_fast(results, fast_report_path)
 
         # 检查结果
         checks = {
             '找到PDF文件': len(results) > 0,
             '报告生成成功': os.path.exists(report_path),
+            '快速报告生成成功': os.path.exists(fast_report_path),
             '至少一个文件匹配': any(r['overall_match'] for r in results) if results else False
         }
 
@@ -242,6 +286,8 @@ def test_4_integration():
                 msg = f"找到 {len(results)} 个文件"
             elif check_name == '报告生成成功':
                 msg = f"报告路径: {report_path}"
+            elif check_name == '快速报告生成成功':
+                msg = f"报告路径: {fast_report_path}"
             elif check_name == '至少一个文件匹配':
                 matched = sum(1 for r in results if r['overall_match'])
                 msg = f"{matched}/{len(results)} 文件匹配"
@@ -270,6 +316,184 @@ def test_4_integration():
         return False
 
 
+def test_5_parallel_modes():
+    """测试5：串行与多进程结果一致，多进程模式的缓存合并与预处理"""
+    print_header("测试5：并行方式 (none / process)")
+
+    src_pdf = '/home/user/Slipt_verif/809_MARTINEZ MONTERO_ LAURA MARIA_Payslip_01092024.pdf'
+    if not os.path.exists(src_pdf):
+        print_result("测试文件准备", False, "未找到源PDF文件")
+        return False
+
+    test_dir = tempfile.mkdtemp(prefix='slipt_verif_modes_')
+    for test_file in [
+        '809_MARTINEZ MONTERO_ LAURA MARIA_Payslip_01092024.pdf',
+        '809_MARTINEZ_MONTERO_LAURA_MARIA_Payslip_01092024.pdf',
+        'nombre_invalido.pdf',
+    ]:
+        shutil.copy2(src_pdf, os.path.join(test_dir, test_file))
+
+    def run(mode):
+        calls = []
+        results = validate_folder(test_dir, lambda *args: calls.append(args), workers=2, parallel=mode)
+        return results, len(calls)
+
+    try:
+        ref, ref_calls = run('none')
+        process_results, process_calls = run('process')
+
+        try:
+            validate_folder(test_dir, parallel='thread')
+            bad_mode_rejected = False
+        except ValueError:
+            bad_mode_rejected = True
+
+        # 仅在本测试中启用缓存：子进程把提取结果交回主进程，
+        # 第二次验证应全部命中缓存，不再启动进程
+        original_executor = validator_core.ProcessPoolExecutor
+        original_cache_path = validator_core.CACHE_PATH
+        validator_core._cache_enabled = True
+        validator_core.CACHE_PATH = os.path.join(test_dir, 'cache.json')
+        validator_core._EXTRACT_CACHE.clear()
+        try:
+            cached_first, _ = run('process')
+            merged_entries = len(validator_core._EXTRACT_CACHE)
+
+            def no_pool(*args, **kwargs):
+                raise AssertionError('不应启动进程')
+            validator_core.ProcessPoolExecutor = no_pool
+            cached_second, cached_calls = run('process')
+        finally:
+            validator_core.ProcessPoolExecutor = original_executor
+            validator_core.CACHE_PATH = original_cache_path
+            validator_core._cache_enabled = False
+            validator_core._cache_dirty = False
+            validator_core._EXTRACT_CACHE.clear()
+    finally:
+        shutil.rmtree(test_dir)
+
+    checks = {
+        '串行处理全部文件': len(ref) == 3 and ref_calls == 3,
+        '多进程结果一致': process_results == ref and process_calls == ref_calls,
+        '非法并行方式报错': bad_mode_rejected,
+        '多进程缓存合并': cached_first == ref and merged_entries == 2,
+        '缓存命中时不启动进程': cached_second == ref and cached_calls == ref_calls,
+    }
+
+    passed_count = 0
+    for check_name, check_result in checks.items():
+        passed_count += check_result
+        print_result(check_name, check_result)
+
+    total = len(checks)
+    print(f"\n测试5结果: {passed_count}/{total} 通过")
+    return passed_count == total
+
+
+def test_6_month_search():
+    """测试6：月份查找（自动机与正则回退）"""
+    print_header("测试6：月份查找 (search_month)")
+
+    # 每行分别用 MONTH_PATTERN、自动机路径和正则回退路径查找，三者必须一致
+    cases = {
+        '带重音的行': 'Período: Enero 2024',
+        '全大写': 'ENERO',
+        '后接字母': 'eneros',
+        '前接字母': 'xenero',
+        '前接数字': '1enero',
+        '后接数字': 'enero1',
+        '后接下划线': 'enero_2024',
+        '前接下划线': '_marzo',
+        '前接重音字母': 'ñenero',
+        '长s (ſ)': 'ſeptiembre 2024',
+        '无点i (ı)': 'julıo',
+        '大写带点I (İ，小写后长度改变)': 'DİCIEMBRE 2023',
+        '同一行多个月份': 'mayo y junio',
+        '第一个不成词，取第二个': 'xmayo junio',
+        '斜杠分隔': 'NOVIEMBRE/DICIEMBRE',
+        'setiembre 拼写': 'setiembre',
+        '没有月份': 'Período 2024',
+    }
+
+    def expected(line):
+        m = header_detect.MONTH_PATTERN.search(line)
+        return m.group(1) if m else None
+
+    automaton = header_detect.MONTH_AUTOMATON
+    checks = {}
+    for name, line in cases.items():
+        automaton_result = header_detect.search_month(line)
+        header_detect.MONTH_AUTOMATON = None
+        try:
+            fallback_result = header_detect.search_month(line)
+        finally:
+            header_detect.MONTH_AUTOMATON = automaton
+        checks[name] = automaton_result == fallback_result == expected(line)
+
+    passed_count = 0
+    for check_name, check_result in checks.items():
+        passed_count += check_result
+        print_result(check_name, check_result)
+    if automaton is None:
+        print("  （未安装 pyahocorasick：两条路径均为正则回退）")
+
+    total = len(checks)
+    print(f"\n测试6结果: {passed_count}/{total} 通过")
+    return passed_count == total
+
+
+def test_7_period_pairing():
+    """测试7：月份与年份配对（PERÍODO 窗口与全文回退）"""
+    print_header("测试7：月份与年份配对")
+
+    empty = ['']
+    # (检查名称, 输入行, 期望的 (月, 年, PERÍODO 行号))
+    cases = [
+        ('窗口内优先取后面的年份',
+         ['PERÍODO', 'x', '2023', 'Mayo', 'a', '2024'], ('Mayo', '2024', 0)),
+        ('同一行的年份距离为0',
+         ['PERÍODO', 'Marzo 2024', '2023'], ('Marzo', '2024', 0)),
+        ('后面的年份恰好相隔6行',
+         ['PERÍODO', 'Abril'] + empty * 5 + ['2024'], ('Abril', '2024', 0)),
+        ('窗口内前面的年份恰好相隔3行',
+         ['PERÍODO 2024'] + empty * 2 + ['Junio'], ('Junio', '2024', 0)),
+        ('距离相同取第一个月份',
+         ['PERÍODO', 'Enero', '2024', 'Febrero', '2025'], ('Enero', '2024', 0)),
+        ('距离更近的月份优先',
+         ['PERÍODO', 'Enero', '', '', '2024', 'Febrero 2025'], ('Febrero', '2025', 0)),
+        ('全文回退：后面的年份恰好相隔8行',
+         ['2023', 'Abril'] + empty * 7 + ['2024'], ('Abril', '2024', None)),
+        ('全文回退：超过8行改取前面的年份',
+         ['2023', 'Abril'] + empty * 8 + ['2024'], ('Abril', '2023', None)),
+        ('全文回退：前后距离相同取前面的年份',
+         ['2023'] + empty * 8 + ['Julio'] + empty * 8 + ['2024'], ('Julio', '2023', None)),
+        ('第60行之后的 PERÍODO 不计',
+         empty * 60 + ['PERÍODO Mayo 2024'], ('Mayo', '2024', None)),
+    ]
+    # 仅看 PERÍODO 窗口：刚超出6行（向后）或3行（向前）时不配对
+    window_cases = [
+        ('窗口内后面的年份相隔7行不配对',
+         ['PERÍODO', 'Abril'] + empty * 6 + ['2024'], (None, None)),
+        ('窗口内前面的年份相隔4行不配对',
+         ['PERÍODO 2024'] + empty * 3 + ['Junio'], (None, None)),
+    ]
+
+    checks = {}
+    for name, lines, expected in cases:
+        checks[name] = header_detect.extract_periodo_mes_anio(lines) == expected
+    for name, lines, expected in window_cases:
+        checks[name] = header_detect.find_month_year_in_window(lines, 0) == expected
+
+    passed_count = 0
+    for check_name, check_result in checks.items():
+        passed_count += check_result
+        print_result(check_name, check_result)
+
+    total = len(checks)
+    print(f"\n测试7结果: {passed_count}/{total} 通过")
+    return passed_count == total
+
+
 def main():
     """主测试函数"""
     print("\n" + "█"*60)
@@ -283,7 +507,10 @@ def main():
         ("文件名解析", test_1_filename_parsing),
         ("PDF信息提取", test_2_pdf_extraction),
         ("比对逻辑", test_3_comparison_logic),
-        ("集成测试", test_4_integration)
+        ("集成测试", test_4_integration),
+        ("并行方式", test_5_parallel_modes),
+        ("月份查找", test_6_month_search),
+        ("月份年份配对", test_7_period_pairing)
     ]
 
     results = []
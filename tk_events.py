@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""
+Canal de eventos entre hilos de trabajo y el bucle principal de Tk
+
+Los hilos de trabajo nunca tocan widgets: publican eventos con put() y el
+bucle de Tk los procesa en el hilo principal. Donde Tk soporta
+createfilehandler (Linux/Mac) se despierta mediante un os.pipe(); en Windows
+se recurre a un sondeo periódico con after().
+"""
+
+import os
+import queue
+
+
+class TkEventChannel:
+    def __init__(self, root, handler, poll_ms=50):
+        self.root = root
+        self.handler = handler
+        self.poll_ms = poll_ms
+        self._queue = queue.Queue()
+        self._closed = False
+        self._pipe_r = self._pipe_w = None
+
+        if hasattr(root.tk, 'createfilehandler'):
+            import tkinter as tk
+            self._pipe_r, self._pipe_w = os.pipe()
+            root.tk.createfilehandler(self._pipe_r, tk.READABLE, self._drain)
+        else:
+            self.root.after(self.poll_ms, self._poll)
+
+    def put(self, *event):
+        """Publicar un evento desde cualquier hilo"""
+        self._queue.put(event)
+        if self._pipe_w is not None:
+            try:
+                os.write(self._pipe_w, b'\0')
+            except OSError:
+                pass
+
+    def _drain(self, fd=None, mask=None):
+        """Procesar los eventos pendientes en el hilo de Tk"""
+        if self._pipe_r is not None:
+            os.read(self._pipe_r, 4096)
+        while True:
+            try:
+                event = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self.handler(*event)
+
+    def _poll(self):
+        if self._closed:
+            return
+        self._drain()
+        self.root.after(self.poll_ms, self._poll)
+
+    def close(self):
+        """Desregistrar el canal y liberar el pipe"""
+        self._closed = True
+        if self._pipe_r is not None:
+            self.root.tk.deletefilehandler(self._pipe_r)
+            os.close(self._pipe_r)
+            os.close(self._pipe_w)
+            self._pipe_r = self._pipe_w = None
@@ -4,32 +4,167 @@ Validador de Nóminas PDF - Módulo de validación central
 No depende de GUI, procesamiento de lógica pura
 """
 
+import atexit
+import json
 import os
 import re
+import multiprocessing
 import unicodedata
-from datetime import datetime
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+from operator import itemgetter
 import fitz  # PyMuPDF
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.utils import get_column_letter
 
+try:
+    import xlsxwriter  # opcional: escritura rápida del reporte
+except ImportError:
+    xlsxwriter = None
+
+
+MAX_WORKERS = 8  # procesos máximos para validar una carpeta
+HEADER_CHARS = 4096  # los campos de la nómina están en el inicio de la primera página
+HEAD_LINES = 60  # líneas de texto revisadas por las búsquedas de respaldo
+STORE_SHRINK_EVERY = 32  # archivos entre vaciados de la caché interna de MuPDF
+PARALLEL_MODES = ('none', 'process')  # valores de validate_folder(parallel=...)
+
+
+# ===== Patrones precompilados =====
+_FILENAME_RE = re.compile(r'^(\d{2,6})_(.*?)_Payslip_(.+)$', re.IGNORECASE)
+_CODIGO_RE = re.compile(r'\n\s*(\d{2,6})\/\d\s*\n')
+_CODIGO_LINE_RE = re.compile(r'^\d{2,6}$')
+_NOMBRE_RE = re.compile(r'\n\s*\d{2,6}\/\d\s*\n\s*([A-ZÁÉÍÓÚÜÑ ,.\'\\-]+?)\s*\n')
+_NIF_RE = re.compile(r'N\.I\.F\.\s*([A-Z0-9]{8,})')
+_PERIODO_RE = re.compile(r'PERÍODO\s+(\d{1,2}\s+\w+\s+\d{1,2}\s+\w+\s+\d{4})', re.IGNORECASE)
+_AFIL_RE = re.compile(r'Afiliación\s+S\.S\.\s+(\d+)', re.IGNORECASE)
+_NOMBRE_LINE_RE = re.compile(r'^[^\n,]*,.*$', re.MULTILINE)  # líneas que contienen coma
+
+
+# ===== Caché de extracción en disco =====
+# JSON {"version": CACHE_VERSION, "entries": {"<ruta absoluta>|<mtime_ns>|<tamaño>": info}};
+# se desactiva con SLIPT_VERIF_NO_CACHE=1. Contiene datos personales (nombre, NIF, Nº S.S.)
+# Solo se escribe desde el proceso principal: los trabajadores de parallel='process' le
+# devuelven sus entradas nuevas junto con cada resultado
+CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'slipt_verif', 'extract.json')
+CACHE_VERSION = 2  # subir al cambiar _extract_pdf_info: invalida todas las entradas guardadas
+CACHE_MAX_ENTRIES = 5000  # al guardar se conservan solo las entradas más recientes
+_cache_enabled = os.environ.get('SLIPT_VERIF_NO_CACHE') != '1'
+_cache_dirty = False
+
+
+def _load_cache() -> dict:
+    global _cache_dirty
+    if not _cache_enabled:
+        return {}
+    try:
+        with open(CACHE_PATH, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if isinstance(data, dict) and data.get('version') == CACHE_VERSION and isinstance(data.get('entries'), dict):
+        return data['entries']
+    # Formato o versión del extractor anteriores: se descarta y se reescribe al salir
+    _cache_dirty = True
+    return {}
+
+
+def _save_cache():
+    """
+    Guardar la caché de forma atómica (se llama al salir del proceso)
+    Antes se eliminan las entradas de PDFs borrados o modificados y se limita el tamaño
+    """
+    if not (_cache_enabled and _cache_dirty):
+        return
+    if multiprocessing.current_process().name != 'MainProcess':
+        return
+    entries = [
+        (key, info) for key, info in list(_EXTRACT_CACHE.items())
+        if _cache_key(key.rsplit('|', 2)[0]) == key
+    ]
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        tmp_path = f"{CACHE_PATH}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CACHE_VERSION, 'entries': dict(entries[-CACHE_MAX_ENTRIES:])},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, CACHE_PATH)
+    except OSError:
+        pass
+
+
+def _cache_key(pdf_path: str):
+    if not _cache_enabled:
+        return None
+    try:
+        st = os.stat(pdf_path)
+    except OSError:
+        return None
+    return f"{os.path.abspath(pdf_path)}|{st.st_mtime_ns}|{st.st_size}"
+
+
+def _cache_store(key: str, info: dict):
+    global _cache_dirty
+    _EXTRACT_CACHE[key] = info
+    _cache_dirty = True
+
+
+_EXTRACT_CACHE = _load_cache()
+atexit.register(_save_cache)
+
 
 # ===== Funciones de utilidad =====
+def _strip_accents_slow(s: str) -> str:
+    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+
+
+# Tabla de traducción para los caracteres latinos acentuados (Latin-1 y Latin Extended-A),
+# generada con la misma regla NFD + quitar marcas
+_ACCENT_TABLE = str.maketrans({
+    ch: stripped
+    for ch, stripped in ((chr(cp), _strip_accents_slow(chr(cp))) for cp in range(0xC0, 0x180))
+    if stripped != ch
+})
+
+
 def strip_accents(s: str) -> str:
     """Eliminar acentos"""
-    return ''.join(c for c in unicodedata.normalize('NFD', s) if unicodedata.category(c) != 'Mn')
+    if s.isascii():  # O(1) en CPython: el caso común de nombres sin acentos
+        return s
+    out = s.translate(_ACCENT_TABLE)
+    if out.isascii():
+        return out
+    # Caracteres fuera de la tabla (no latinos, marcas sueltas...): vía general
+    return _strip_accents_slow(s)
 
 
+@lru_cache(maxsize=4096)
 def normalize_name(name: str) -> str:
     """Normalizar nombre: quitar acentos, convertir a mayúsculas, eliminar espacios extra"""
-    name = strip_accents(name)
-    name = name.upper()
-    name = re.sub(r'\s+', ' ', name)
-    name = name.strip()
-    # Eliminar comas y guiones bajos
-    name = name.replace(',', ' ').replace('_', ' ')
-    name = re.sub(r'\s+', ' ', name)
-    return name.strip()
+    # Función pura: se memoriza, los mismos nombres se repiten entre archivo y PDF
+    # Comas y guiones bajos cuentan como separadores; split() sin argumentos colapsa
+    # cualquier racha de espacios (los mismos que \s) y descarta los de los extremos
+    name = strip_accents(name).upper().replace(',', ' ').replace('_', ' ')
+    return ' '.join(name.split())
+
+
+def _header_slice(text: str) -> str:
+    """Primeros HEADER_CHARS caracteres del texto, cortados en fin de línea"""
+    if len(text) <= HEADER_CHARS:
+        return text
+    return text[:text.rfind('\n', 0, HEADER_CHARS) + 1]
+
+
+def _search_header_first(pattern, header: str, text: str, pos: int = 0):
+    """Buscar en la cabecera (desde pos); solo si no aparece, en el texto completo"""
+    match = pattern.search(header, pos)
+    if match is None and len(header) < len(text):
+        match = pattern.search(text, pos)
+    return match
 
 
 def parse_filename(filename: str) -> dict:
@@ -43,8 +178,7 @@ def parse_filename(filename: str) -> dict:
 
     # Intentar coincidir formato: código_nombre_Payslip_fecha
     # Código puede ser 2-6 dígitos
-    pattern = r'^(\d{2,6})_(.*?)_Payslip_(.+)$'
-    match = re.match(pattern, name, re.IGNORECASE)
+    match = _FILENAME_RE.match(name)
 
     if match:
         codigo = match.group(1)
@@ -70,44 +204,79 @@ def parse_filename(filename: str) -> dict:
 def extract_pdf_info(pdf_path: str) -> dict:
     """
     Extraer información clave del PDF
+    Los resultados válidos se guardan en la caché de disco: un PDF sin cambios
+    (misma ruta, fecha de modificación y tamaño) no se vuelve a analizar
     Retorna: {'codigo': '809', 'nombre': 'MARTINEZ MONTERO, LAURA MARIA', 'nif': '...', 'periodo': '...'}
     """
+    key = _cache_key(pdf_path)
+    if key is not None:
+        cached = _EXTRACT_CACHE.get(key)
+        if cached is not None:
+            return dict(cached)
+
+    info = _extract_pdf_info(pdf_path)
+    if key is not None and info.get('valid'):
+        _cache_store(key, dict(info))
+    return info
+
+
+def _extract_pdf_info(pdf_path: str) -> dict:
+    """Análisis real del PDF (sin caché)"""
     try:
         with fitz.open(pdf_path) as doc:
             # Normalmente la información está en la primera página
             if doc.page_count > 0:
                 page = doc[0]
-                text = page.get_text('text')
+                # El coste está en interpretar la página, no en las regex: recortar por zona
+                # (clip o get_text('words') con filtro por y) no lo reduce y, además, el
+                # orden del flujo de texto no sigue la posición en la página.
+                # El TextPage se construye una sola vez: si se necesitan más vistas
+                # (extractWORDS, extractBLOCKS...) deben salir de este mismo objeto.
+                textpage = page.get_textpage(flags=fitz.TEXTFLAGS_TEXT)
+                text = textpage.extractText()
+                del textpage, page  # liberar la página (y sus cachés de MuPDF) antes del análisis
+                header = _header_slice(text)
 
                 # Extraer código (formato 809/1)
                 codigo = None
-                codigo_pattern = r'\n\s*(\d{2,6})\/\d\s*\n'
-                match = re.search(codigo_pattern, text)
+                codigo_pos = None
+                match = _search_header_first(_CODIGO_RE, header, text)
                 if match:
                     codigo = match.group(1)
+                    codigo_pos = match.start()
+
+                # Las dos búsquedas de respaldo comparten las primeras líneas, que se
+                # separan una sola vez y solo si alguna de ellas llega a ejecutarse
+                head_lines = None
 
                 # Si no se encuentra, intentar otros patrones
                 if not codigo:
                     # Intentar encontrar línea de código independiente
-                    for line in text.split('\n')[:30]:
+                    head_lines = text.split('\n', HEAD_LINES)[:HEAD_LINES]
+                    for line in head_lines[:30]:
                         line = line.strip()
-                        if re.match(r'^\d{2,6}$', line):
+                        if _CODIGO_LINE_RE.match(line):
                             codigo = line
                             break
 
                 # Extraer nombre (usualmente nombre completo en mayúsculas)
+                # _NOMBRE_RE empieza con el mismo patrón que _CODIGO_RE: solo puede
+                # coincidir desde la primera posición de código, y nunca si no la hay
                 nombre = None
-                nombre_pattern = r'\n\s*\d{2,6}\/\d\s*\n\s*([A-ZÁÉÍÓÚÜÑ ,.\'\\-]+?)\s*\n'
-                match = re.search(nombre_pattern, text)
-                if match:
-                    nombre = normalize_name(match.group(1))
+                if codigo_pos is not None:
+                    match = _search_header_first(_NOMBRE_RE, header, text, codigo_pos)
+                    if match:
+                        nombre = normalize_name(match.group(1))
 
                 # Si no se encuentra, buscar líneas en mayúsculas que contengan coma (los nombres suelen tener coma)
                 if not nombre:
-                    lines = text.split('\n')[:60]
-                    for line in lines:
-                        line = line.strip()
-                        if ',' in line and line.isupper() and len(line.split()) >= 2:
+                    # Una pasada de regex entrega solo las líneas con coma de las primeras
+                    if head_lines is None:
+                        head_lines = text.split('\n', HEAD_LINES)[:HEAD_LINES]
+                    head = '\n'.join(head_lines)
+                    for m in _NOMBRE_LINE_RE.finditer(head):
+                        line = m.group().strip()
+                        if line.isupper() and len(line.split()) >= 2:
                             # Asegurar que no sea dirección u otra información
                             if 'CL ' not in line and 'PZ ' not in line and 'BARCELONA' not in line:
                                 nombre = normalize_name(line)
@@ -115,22 +284,19 @@ def extract_pdf_info(pdf_path: str) -> dict:
 
                 # Extraer NIF
                 nif = None
-                nif_pattern = r'N\.I\.F\.\s*([A-Z0-9]{8,})'
-                match = re.search(nif_pattern, text)
+                match = _search_header_first(_NIF_RE, header, text)
                 if match:
                     nif = match.group(1)
 
                 # Extraer período
                 periodo = None
-                periodo_pattern = r'PERÍODO\s+(\d{1,2}\s+\w+\s+\d{1,2}\s+\w+\s+\d{4})'
-                match = re.search(periodo_pattern, text, re.IGNORECASE)
+                match = _search_header_first(_PERIODO_RE, header, text)
                 if match:
                     periodo = match.group(1)
 
                 # Extraer Nº. Afiliación S.S.
                 afiliacion = None
-                afiliacion_pattern = r'Afiliación\s+S\.S\.\s+(\d+)'
-                match = re.search(afiliacion_pattern, text, re.IGNORECASE)
+                match = _search_header_first(_AFIL_RE, header, text)
                 if match:
                     afiliacion = match.group(1)
 
@@ -155,9 +321,26 @@ def extract_pdf_info(pdf_path: str) -> dict:
         }
 
 
+def _token_similarity(a_tokens: list, b_tokens: list, threshold: float) -> float:
+    """
+    Jaccard sobre multiconjuntos de palabras: no depende del orden (los apellidos
+    pueden venir invertidos) y cuenta las repeticiones (GARCIA GARCIA ≠ GARCIA).
+    Si la similitud no puede llegar a threshold se abandona y retorna 0.0
+    """
+    n, m = len(a_tokens), len(b_tokens)
+    # La intersección no supera la lista corta y la unión no baja de la larga
+    if min(n, m) < threshold * max(n, m):
+        return 0.0
+    common = sum((Counter(a_tokens) & Counter(b_tokens)).values())
+    return common / (n + m - common)
+
+
 def compare_info(filename_info: dict, pdf_info: dict) -> dict:
     """
     Comparar nombre de archivo y contenido del PDF
+    filename_info['nombre'] llega ya normalizado por parse_filename; pdf_info['nombre']
+    se normaliza aquí porque compare_info también acepta datos que no vienen de
+    extract_pdf_info (con extract_pdf_info es un acierto de la caché de normalize_name)
     Retorna resultado de validación
     """
     result = {
@@ -178,22 +361,20 @@ def compare_info(filename_info: dict, pdf_info: dict) -> dict:
 
     # Comparar nombre (después de normalizar)
     if filename_info.get('nombre') and pdf_info.get('nombre'):
-        fn_nombre = normalize_name(filename_info['nombre'])
+        fn_nombre = filename_info['nombre']
         pdf_nombre = normalize_name(pdf_info['nombre'])
 
         # Coincidencia exacta o muy similar
         if fn_nombre == pdf_nombre:
             result['nombre_match'] = True
         else:
-            # Verificar si existe relación de contención (porque el formato puede variar ligeramente)
-            fn_parts = set(fn_nombre.split())
-            pdf_parts = set(pdf_nombre.split())
+            # Comparar por palabras, sin importar el orden (porque el formato puede variar ligeramente)
+            fn_parts = fn_nombre.split()
+            pdf_parts = pdf_nombre.split()
 
             # Si al menos el 80% de las palabras coinciden, considerar similar
             if fn_parts and pdf_parts:
-                intersection = fn_parts & pdf_parts
-                union = fn_parts | pdf_parts
-                similarity = len(intersection) / len(union)
+                similarity = _token_similarity(fn_parts, pdf_parts, 0.8)
 
                 if similarity >= 0.8:
                     result['nombre_match'] = True
@@ -211,176 +392,329 @@ def compare_info(filename_info: dict, pdf_info: dict) -> dict:
     return result
 
 
-def validate_folder(folder_path: str, progress_callback=None) -> list:
+def _process_one(filename: str, pdf_path: str) -> dict:
+    """Validar un único PDF: analizar nombre, extraer contenido y comparar"""
+    # Analizar nombre de archivo
+    filename_info = parse_filename(filename)
+
+    # Extraer información del PDF (el paso caro): no hace falta si el nombre no es válido
+    pdf_info = extract_pdf_info(pdf_path) if filename_info.get('valid') else {}
+
+    # Comparar información
+    if filename_info.get('valid') and pdf_info.get('valid'):
+        comparison = compare_info(filename_info, pdf_info)
+    else:
+        comparison = {
+            'codigo_match': False,
+            'nombre_match': False,
+            'overall_match': False,
+            'errors': []
+        }
+        if not filename_info.get('valid'):
+            comparison['errors'].append(filename_info.get('error', 'Fallo al analizar nombre de archivo'))
+        elif not pdf_info.get('valid'):
+            comparison['errors'].append(pdf_info.get('error', 'Fallo al analizar PDF'))
+
+    # Consolidar resultados
+    return {
+        'filename': filename,
+        'fn_codigo': filename_info.get('codigo', ''),
+        'fn_nombre': filename_info.get('nombre', ''),
+        'fn_fecha': filename_info.get('fecha', ''),
+        'pdf_codigo': pdf_info.get('codigo', ''),
+        'pdf_nombre': pdf_info.get('nombre', ''),
+        'pdf_nif': pdf_info.get('nif', ''),
+        'pdf_periodo': pdf_info.get('periodo', ''),
+        'pdf_afiliacion': pdf_info.get('afiliacion', ''),
+        'codigo_match': comparison['codigo_match'],
+        'nombre_match': comparison['nombre_match'],
+        'overall_match': comparison['overall_match'],
+        'errors': '; '.join(comparison['errors']) if comparison['errors'] else ''
+    }
+
+
+_worker_files = 0  # archivos validados por este proceso de trabajo
+
+
+def _init_worker(cache_enabled: bool):
+    """El trabajador sigue al proceso principal, que es quien decide si hay caché"""
+    global _cache_enabled
+    _cache_enabled = cache_enabled
+
+
+def _process_one_in_worker(filename: str, pdf_path: str) -> tuple:
+    """
+    _process_one para el modo con procesos: cada trabajador vacía su propia caché de MuPDF
+    Retorna (resultado, (clave, entrada de la caché de extracción o None)) para que el
+    proceso principal guarde lo extraído por el trabajador
+    """
+    global _worker_files
+    result = _process_one(filename, pdf_path)
+    _worker_files += 1
+    if _worker_files % STORE_SHRINK_EVERY == 0:
+        fitz.TOOLS.store_shrink(100)
+    key = _cache_key(pdf_path)
+    return result, (key, _EXTRACT_CACHE.get(key) if key is not None else None)
+
+
+def validate_folder(folder_path: str, progress_callback=None, workers=None, parallel='none') -> list:
     """
     Validar todos los archivos PDF en la carpeta
-    Retorna lista de resultados de validación
+    parallel elige cómo se reparten los PDFs:
+      'none'    - en serie, en el hilo llamante (por defecto; la GUI ya valida fuera
+                  del hilo de Tk)
+      'process' - procesos: cada uno con su propio MuPDF, sin compartir el GIL; a cambio
+                  del arranque, compensa en carpetas grandes
+    No hay modo con hilos: PyMuPDF mantiene el GIL al interpretar la página y no admite
+    el uso desde varios hilos.
+    workers limita los procesos (None = automático).
+    progress_callback se invoca desde el hilo llamante al terminar cada archivo.
+    Retorna lista de resultados de validación, en el orden de la carpeta
     """
-    results = []
+    if parallel not in PARALLEL_MODES:
+        raise ValueError(f"parallel debe ser uno de {PARALLEL_MODES}, no {parallel!r}")
 
-    # Obtener todos los archivos PDF
-    pdf_files = [f for f in os.listdir(folder_path) if f.lower().endswith('.pdf')]
+    # Obtener todos los archivos PDF (DirEntry ya trae nombre y ruta)
+    with os.scandir(folder_path) as it:
+        pdf_files = [e for e in it if e.name.lower().endswith('.pdf') and e.is_file()]
     total_files = len(pdf_files)
 
     if total_files == 0:
+        return []
+
+    # La caché de MuPDF (fuentes, recursos) se conserva entre archivos y solo se vacía
+    # cada STORE_SHRINK_EVERY: aquí en modo serie, en cada trabajador en modo procesos
+    if parallel == 'none':
+        results = []
+        for done, entry in enumerate(pdf_files, 1):
+            results.append(_process_one(entry.name, entry.path))
+            if done % STORE_SHRINK_EVERY == 0:
+                fitz.TOOLS.store_shrink(100)
+            if progress_callback:
+                progress_callback(done, total_files, entry.name)
         return results
 
-    for idx, filename in enumerate(pdf_files):
-        if progress_callback:
-            progress_callback(idx + 1, total_files, filename)
-
-        pdf_path = os.path.join(folder_path, filename)
-
-        # Analizar nombre de archivo
-        filename_info = parse_filename(filename)
+    # Los PDFs que no hay que analizar (nombre no válido o ya en la caché) se resuelven
+    # aquí mismo: al pool solo van los nuevos o modificados, y si no hay ninguno no se
+    # arranca ningún proceso
+    results = [None] * total_files
+    done = 0
+    pending = []
+    for idx, entry in enumerate(pdf_files):
+        if not parse_filename(entry.name)['valid'] or _cache_key(entry.path) in _EXTRACT_CACHE:
+            results[idx] = _process_one(entry.name, entry.path)
+            done += 1
+            if progress_callback:
+                progress_callback(done, total_files, entry.name)
+        else:
+            pending.append(idx)
+    if not pending:
+        return results
 
-        # Extraer información del PDF
-        pdf_info = extract_pdf_info(pdf_path)
+    # Más trabajadores que núcleos no aceleran; por encima de MAX_WORKERS domina la
+    # contención en disco (y cada proceso carga su propia copia de MuPDF)
+    max_workers = workers or min(MAX_WORKERS, os.cpu_count() or 1)
+    # 'spawn': no se hace fork de un proceso con Tk e hilos activos
+    executor = ProcessPoolExecutor(
+        max_workers=max_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=_init_worker,
+        initargs=(_cache_enabled,)
+    )
 
-        # Comparar información
-        if filename_info.get('valid') and pdf_info.get('valid'):
-            comparison = compare_info(filename_info, pdf_info)
-        else:
-            comparison = {
-                'codigo_match': False,
-                'nombre_match': False,
-                'overall_match': False,
-                'errors': []
-            }
-            if not filename_info.get('valid'):
-                comparison['errors'].append(filename_info.get('error', 'Fallo al analizar nombre de archivo'))
-            if not pdf_info.get('valid'):
-                comparison['errors'].append(pdf_info.get('error', 'Fallo al analizar PDF'))
-
-        # Consolidar resultados
-        result = {
-            'filename': filename,
-            'fn_codigo': filename_info.get('codigo', ''),
-            'fn_nombre': filename_info.get('nombre', ''),
-            'fn_fecha': filename_info.get('fecha', ''),
-            'pdf_codigo': pdf_info.get('codigo', ''),
-            'pdf_nombre': pdf_info.get('nombre', ''),
-            'pdf_nif': pdf_info.get('nif', ''),
-            'pdf_periodo': pdf_info.get('periodo', ''),
-            'pdf_afiliacion': pdf_info.get('afiliacion', ''),
-            'codigo_match': comparison['codigo_match'],
-            'nombre_match': comparison['nombre_match'],
-            'overall_match': comparison['overall_match'],
-            'errors': '; '.join(comparison['errors']) if comparison['errors'] else ''
+    with executor as ex:
+        futures = {
+            ex.submit(_process_one_in_worker, pdf_files[idx].name, pdf_files[idx].path): idx
+            for idx in pending
         }
-
-        results.append(result)
+        for future in as_completed(futures):
+            idx = futures[future]
+            done += 1
+            results[idx], (key, cached) = future.result()
+            if cached is not None and key not in _EXTRACT_CACHE:
+                _cache_store(key, cached)
+            if progress_callback:
+                progress_callback(done, total_files, pdf_files[idx].name)
 
     return results
 
 
+REPORT_HEADERS = [
+    'Nombre de archivo',
+    'Archivo-Código',
+    'Archivo-Nombre',
+    'Archivo-Fecha',
+    'PDF-Código',
+    'PDF-Nombre',
+    'PDF-NIF',
+    'PDF-Período',
+    'PDF-Nº Seg. Social',
+    'Código coincide',
+    'Nombre coincide',
+    'Resultado validación',
+    'Descripción de error'
+]
+
+REPORT_COLUMN_WIDTHS = [35, 12, 30, 15, 12, 30, 15, 25, 18, 10, 10, 12, 50]
+
+# Columnas de datos (sin color) del reporte, en orden
+_REPORT_DATA_FIELDS = itemgetter(
+    'filename', 'fn_codigo', 'fn_nombre', 'fn_fecha',
+    'pdf_codigo', 'pdf_nombre', 'pdf_nif', 'pdf_periodo', 'pdf_afiliacion'
+)
+
+# Estilos del reporte openpyxl: instancias únicas compartidas por todos los reportes
+_HEADER_FILL = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+_HEADER_FONT = Font(bold=True, color="FFFFFF", size=11)
+_GREEN_FILL = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+_RED_FILL = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
+_YELLOW_FILL = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
+_BOLD_FONT = Font(bold=True)
+_STATS_TITLE_FONT = Font(bold=True, size=12)
+_HEADER_ALIGNMENT = Alignment(horizontal='center', vertical='center', wrap_text=True)
+_CENTER = Alignment(horizontal='center')
+_WRAP = Alignment(wrap_text=True)
+_THIN_SIDE = Side(style='thin')
+_BORDER = Border(left=_THIN_SIDE, right=_THIN_SIDE, top=_THIN_SIDE, bottom=_THIN_SIDE)
+
+
 def generate_excel_report(results: list, output_path: str):
     """
     Generar reporte Excel, marcar resultados de validación con colores
     Verde: Coincidencia completa
     Rojo: No coincide
+    Las filas se escriben en streaming (write_only): memoria constante en carpetas grandes
     """
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Reporte de Validación"
-
-    # Definir estilos
-    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-    header_font = Font(bold=True, color="FFFFFF", size=11)
-    green_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-    red_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-    yellow_fill = PatternFill(start_color="FFEB9C", end_color="FFEB9C", fill_type="solid")
-
-    border = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-
-    # Encabezados
-    headers = [
-        'Nombre de archivo',
-        'Archivo-Código',
-        'Archivo-Nombre',
-        'Archivo-Fecha',
-        'PDF-Código',
-        'PDF-Nombre',
-        'PDF-NIF',
-        'PDF-Período',
-        'PDF-Nº Seg. Social',
-        'Código coincide',
-        'Nombre coincide',
-        'Resultado validación',
-        'Descripción de error'
-    ]
-
-    for col_num, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col_num)
-        cell.value = header
-        cell.fill = header_fill
-        cell.font = header_font
-        cell.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-        cell.border = border
-
-    # 数据行
-    for row_num, result in enumerate(results, 2):
-        # 基本信息
-        ws.cell(row=row_num, column=1, value=result['filename']).border = border
-        ws.cell(row=row_num, column=2, value=result['fn_codigo']).border = border
-        ws.cell(row=row_num, column=3, value=result['fn_nombre']).border = border
-        ws.cell(row=row_num, column=4, value=result['fn_fecha']).border = border
-        ws.cell(row=row_num, column=5, value=result['pdf_codigo']).border = border
-        ws.cell(row=row_num, column=6, value=result['pdf_nombre']).border = border
-        ws.cell(row=row_num, column=7, value=result['pdf_nif']).border = border
-        ws.cell(row=row_num, column=8, value=result['pdf_periodo']).border = border
-        ws.cell(row=row_num, column=9, value=result['pdf_afiliacion']).border = border
-
-        # Coincidencia de código
-        codigo_cell = ws.cell(row=row_num, column=10, value='✓' if result['codigo_match'] else '✗')
-        codigo_cell.border = border
-        codigo_cell.alignment = Alignment(horizontal='center')
-        codigo_cell.fill = green_fill if result['codigo_match'] else red_fill
-
-        # Coincidencia de nombre
-        nombre_cell = ws.cell(row=row_num, column=11, value='✓' if result['nombre_match'] else '✗')
-        nombre_cell.border = border
-        nombre_cell.alignment = Alignment(horizontal='center')
-        nombre_cell.fill = green_fill if result['nombre_match'] else red_fill
-
-        # Resultado general
-        overall_cell = ws.cell(row=row_num, column=12, value='Coincide' if result['overall_match'] else 'No coincide')
-        overall_cell.border = border
-        overall_cell.alignment = Alignment(horizontal='center')
-        overall_cell.fill = green_fill if result['overall_match'] else red_fill
-        overall_cell.font = Font(bold=True)
-
-        # Descripción de error
-        error_cell = ws.cell(row=row_num, column=13, value=result['errors'])
-        error_cell.border = border
-        error_cell.alignment = Alignment(wrap_text=True)
-        if result['errors']:
-            error_cell.fill = yellow_fill
-
-    # 调整列宽
-    column_widths = [35, 12, 30, 15, 12, 30, 15, 25, 18, 10, 10, 12, 50]
-    for col_num, width in enumerate(column_widths, 1):
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Reporte de Validación")
+
+    # Estilos con nombre registrados una vez: cada celda asigna una sola referencia
+    for name, attrs in (
+        ('header', dict(fill=_HEADER_FILL, font=_HEADER_FONT, alignment=_HEADER_ALIGNMENT)),
+        ('bordered', dict()),
+        ('match_ok', dict(fill=_GREEN_FILL, alignment=_CENTER)),
+        ('match_fail', dict(fill=_RED_FILL, alignment=_CENTER)),
+        ('overall_ok', dict(fill=_GREEN_FILL, alignment=_CENTER, font=_BOLD_FONT)),
+        ('overall_fail', dict(fill=_RED_FILL, alignment=_CENTER, font=_BOLD_FONT)),
+        ('error_cell', dict(alignment=_WRAP)),
+        ('error_flagged', dict(fill=_YELLOW_FILL, alignment=_WRAP)),
+    ):
+        attrs.setdefault('font', DEFAULT_FONT)
+        wb.add_named_style(NamedStyle(name=name, border=_BORDER, **attrs))
+
+    def cell(value, style):
+        c = WriteOnlyCell(ws, value=value)
+        c.style = style
+        return c
+
+    # Anchos de columna y primera fila fija: en write_only deben fijarse antes de escribir filas
+    for col_num, width in enumerate(REPORT_COLUMN_WIDTHS, 1):
         ws.column_dimensions[get_column_letter(col_num)].width = width
-
-    # Congelar primera fila
     ws.freeze_panes = 'A2'
 
+    # Encabezados
+    ws.append([cell(header, 'header') for header in REPORT_HEADERS])
+
+    # Filas de datos (las estadísticas se acumulan en la misma pasada)
+    matched = 0
+    for result in results:
+        if result['overall_match']:
+            matched += 1
+        # Información básica: los 9 campos de datos salen de una sola llamada a itemgetter
+        row = [cell(value, 'bordered') for value in _REPORT_DATA_FIELDS(result)]
+        row += [
+            # Coincidencia de código
+            cell('✓' if result['codigo_match'] else '✗',
+                 'match_ok' if result['codigo_match'] else 'match_fail'),
+            # Coincidencia de nombre
+            cell('✓' if result['nombre_match'] else '✗',
+                 'match_ok' if result['nombre_match'] else 'match_fail'),
+            # Resultado general
+            cell('Coincide' if result['overall_match'] else 'No coincide',
+                 'overall_ok' if result['overall_match'] else 'overall_fail'),
+            # Descripción de error
+            cell(result['errors'], 'error_flagged' if result['errors'] else 'error_cell')
+        ]
+        ws.append(row)
+
     # Añadir información estadística
     total = len(results)
-    matched = sum(1 for r in results if r['overall_match'])
     unmatched = total - matched
 
-    stats_row = len(results) + 3
-    ws.cell(row=stats_row, column=1, value="Información estadística").font = Font(bold=True, size=12)
-    ws.cell(row=stats_row + 1, column=1, value=f"Total de archivos: {total}")
-    ws.cell(row=stats_row + 2, column=1, value=f"Coinciden: {matched}").fill = green_fill
-    ws.cell(row=stats_row + 3, column=1, value=f"No coinciden: {unmatched}").fill = red_fill
-    ws.cell(row=stats_row + 4, column=1, value=f"Tasa de coincidencia: {matched/total*100:.1f}%" if total > 0 else "N/A")
+    title_cell = WriteOnlyCell(ws, value="Información estadística")
+    title_cell.font = _STATS_TITLE_FONT
+    matched_cell = WriteOnlyCell(ws, value=f"Coinciden: {matched}")
+    matched_cell.fill = _GREEN_FILL
+    unmatched_cell = WriteOnlyCell(ws, value=f"No coinciden: {unmatched}")
+    unmatched_cell.fill = _RED_FILL
+
+    ws.append([])
+    ws.append([title_cell])
+    ws.append([f"Total de archivos: {total}"])
+    ws.append([matched_cell])
+    ws.append([unmatched_cell])
+    ws.append([f"Tasa de coincidencia: {matched/total*100:.1f}%" if total > 0 else "N/A"])
 
     # Guardar
     wb.save(output_path)
+
+
+def generate_excel_report_fast(results: list, output_path: str):
+    """
+    Generar el mismo reporte Excel con xlsxwriter (mucho más rápido que openpyxl
+    en reportes grandes, filas escritas en streaming).
+    Si xlsxwriter no está instalado se usa generate_excel_report.
+    """
+    if xlsxwriter is None:
+        return generate_excel_report(results, output_path)
+
+    wb = xlsxwriter.Workbook(output_path, {'constant_memory': True})
+    ws = wb.add_worksheet("Reporte de Validación")
+
+    # Formatos compartidos (uno por combinación, no por celda)
+    header_fmt = wb.add_format({
+        'bold': True, 'font_color': '#FFFFFF', 'font_size': 11, 'bg_color': '#4472C4',
+        'align': 'center', 'valign': 'vcenter', 'text_wrap': True, 'border': 1
+    })
+    cell_fmt = wb.add_format({'border': 1})
+    match_fmt = {
+        True: wb.add_format({'border': 1, 'align': 'center', 'bg_color': '#C6EFCE'}),
+        False: wb.add_format({'border': 1, 'align': 'center', 'bg_color': '#FFC7CE'})
+    }
+    overall_fmt = {
+        True: wb.add_format({'border': 1, 'align': 'center', 'bold': True, 'bg_color': '#C6EFCE'}),
+        False: wb.add_format({'border': 1, 'align': 'center', 'bold': True, 'bg_color': '#FFC7CE'})
+    }
+    error_fmt = wb.add_format({'border': 1, 'text_wrap': True})
+    error_yellow_fmt = wb.add_format({'border': 1, 'text_wrap': True, 'bg_color': '#FFEB9C'})
+
+    # Anchos de columna y panel fijo antes de escribir filas
+    for col_num, width in enumerate(REPORT_COLUMN_WIDTHS):
+        ws.set_column(col_num, col_num, width)
+    ws.freeze_panes(1, 0)
+
+    ws.write_row(0, 0, REPORT_HEADERS, header_fmt)
+
+    matched = 0
+    for row_num, result in enumerate(results, 1):
+        if result['overall_match']:
+            matched += 1
+        ws.write_row(row_num, 0, _REPORT_DATA_FIELDS(result), cell_fmt)
+        ws.write_string(row_num, 9, '✓' if result['codigo_match'] else '✗', match_fmt[bool(result['codigo_match'])])
+        ws.write_string(row_num, 10, '✓' if result['nombre_match'] else '✗', match_fmt[bool(result['nombre_match'])])
+        ws.write_string(row_num, 11, 'Coincide' if result['overall_match'] else 'No coincide',
+                        overall_fmt[bool(result['overall_match'])])
+        ws.write(row_num, 12, result['errors'], error_yellow_fmt if result['errors'] else error_fmt)
+
+    # Añadir información estadística
+    total = len(results)
+    unmatched = total - matched
+
+    stats_row = len(results) + 2
+    ws.write(stats_row, 0, "Información estadística", wb.add_format({'bold': True, 'font_size': 12}))
+    ws.write(stats_row + 1, 0, f"Total de archivos: {total}")
+    ws.write(stats_row + 2, 0, f"Coinciden: {matched}", wb.add_format({'bg_color': '#C6EFCE'}))
+    ws.write(stats_row + 3, 0, f"No coinciden: {unmatched}", wb.add_format({'bg_color': '#FFC7CE'}))
+    ws.write(stats_row + 4, 0, f"Tasa de coincidencia: {matched/total*100:.1f}%" if total > 0 else "N/A")
+
+    wb.close()